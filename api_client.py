@@ -0,0 +1,102 @@
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from telegram.error import TimedOut
+from telegram.utils.request import Request
+
+from monitoring import stats
+from latency import latency
+
+# Small pool used only for hedged (duplicated) idempotent calls
+HEDGE_WORKERS = 4
+hedge_pool = ThreadPoolExecutor(max_workers=HEDGE_WORKERS, thread_name_prefix="hedge")
+# Free workers in hedge_pool. Calls only go to the pool when one is free, so a
+# few stalled calls can't make later ones queue past their own timeout.
+hedge_slots = threading.Semaphore(HEDGE_WORKERS)
+
+
+class TrackedRequest(Request):
+    """Request object for the Bot that counts outbound calls and failures
+
+    Calls without an explicit timeout get one derived from the measured
+    round-trip time of that API method, and slow idempotent calls are hedged
+    with a second copy once they run past their usual latency.
+    """
+
+    def post(self, url, data, timeout=None):
+        method = url.rsplit("/", 1)[-1]
+
+        # getUpdates is a long poll, its duration says nothing about the network
+        if method == "getUpdates":
+            return self._counted(method, url, data, timeout)
+
+        if timeout is None:
+            timeout = latency.timeout_for(method)
+
+        started = time.perf_counter()
+        try:
+            hedge_delay = latency.hedge_delay_for(method)
+            if hedge_delay is not None and hedge_delay < timeout:
+                result = self._hedged(method, url, data, timeout, hedge_delay)
+            else:
+                result = self._counted(method, url, data, timeout)
+        except TimedOut:
+            # Count the timeout as a (long) sample so the estimate backs off
+            latency.record(method, time.perf_counter() - started)
+            raise
+
+        latency.record(method, time.perf_counter() - started)
+        return result
+
+    def _counted(self, method, url, data, timeout):
+        try:
+            result = super().post(url, data, timeout=timeout)
+        except Exception:
+            stats.record_outbound(method, failed=True)
+            raise
+        stats.record_outbound(method)
+        return result
+
+    def _hedged(self, method, url, data, timeout, hedge_delay):
+        first = self._submit(method, url, data, timeout)
+        if first is None:
+            # Pool saturated by slow calls: send it unhedged on this thread
+            return self._counted(method, url, data, timeout)
+        done, _ = wait([first], timeout=hedge_delay)
+        if done:
+            return first.result()
+
+        second = self._submit(method, url, data, timeout)
+        if second is None:
+            return first.result()
+        stats.record_outbound(f"{method}:hedge")
+        done, _ = wait([first, second], return_when=FIRST_COMPLETED)
+        winner = done.pop()
+        # If the faster one failed, fall back to whatever the other one returns
+        if winner.exception() is not None:
+            other = second if winner is first else first
+            return other.result()
+        return winner.result()
+
+    def _submit(self, method, url, data, timeout):
+        """Run a call on a free hedge_pool worker, or return None if there is none"""
+        if not hedge_slots.acquire(blocking=False):
+            return None
+
+        def run():
+            try:
+                return self._counted(method, url, data, timeout)
+            finally:
+                hedge_slots.release()
+
+        return hedge_pool.submit(run)
+
+    def retrieve(self, url, timeout=None):
+        try:
+            result = super().retrieve(url, timeout=timeout)
+        except Exception:
+            stats.record_outbound("file", failed=True)
+            raise
+        stats.record_outbound("file")
+        return result
@@ -1,55 +1,41 @@
+from startup import profiler
 import os
 import time
 import logging
-from datetime import datetime
-from dotenv import load_dotenv
-import requests
-from telegram import InlineKeyboardButton, InlineKeyboardMarkup, ParseMode, Bot
-from telegram.ext import Updater, CommandHandler, MessageHandler, Filters, CallbackQueryHandler, Dispatcher
-from flask import Flask, render_template_string, request
 import threading
+from datetime import datetime
 
-# Load environment variables
-load_dotenv()
-BOT_VERSION = "1.2.0"
-BOT_TOKEN = os.getenv("BOT_TOKEN")
-ADMIN_CODE = os.getenv("ADMIN_CODE")
-REGISTRATION_BOT_URL = os.getenv("REGISTRATION_BOT_URL", "https://t.me/YourRegistrationBot")
-CONTACT_EMAIL = os.getenv("CONTACT_EMAIL", "contact@yetal.com")
-WEBSITE_URL = os.getenv("WEBSITE_URL", "https://yetal.com")
-RENDER_EXTERNAL_URL = os.getenv("RENDER_EXTERNAL_URL", "https://yetalads.onrender.com")
-
-# Validate URLs
-def validate_url(url):
-    """Validate and clean URL"""
-    if not url:
-        return None
-    url = url.strip()
-    if url.startswith("http://") or url.startswith("https://"):
-        return url
-    elif url.startswith("t.me/"):
-        return f"https://{url}"
-    else:
-        return f"https://{url}"
-
-# Validate all URLs
-REGISTRATION_BOT_URL = validate_url(REGISTRATION_BOT_URL)
-WEBSITE_URL = validate_url(WEBSITE_URL)
+# Everything heavy (telegram, requests, the handlers) is imported lazily so a
+# cold start can bind the port and answer /health as early as possible
+with profiler.phase("config"):
+    from config import (
+        BOT_TOKEN, RENDER_EXTERNAL_URL, LATENCY_PROBE_INTERVAL, TELEGRAM_API_URL,
+        STARTUP_MODE, UPDATE_MODE, UPDATE_OFFSET_PATH, POLL_WORKERS,
+        WEBHOOK_CHECK_INTERVAL,
+    )
+flask = profiler.load("flask")
+from monitoring import stats
+from latency import latency, probe_loop
+from polling import Poller, RecentUpdates
 
-# Log startup info
-print("=" * 60)
-print(f"🚀 Yetal Bot Starting...")
-print(f"⏰ {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-print(f"🌐 Render URL: {RENDER_EXTERNAL_URL}")
-print(f"🤖 Bot Token: {'✅ Set' if BOT_TOKEN else '❌ Missing'}")
-print("=" * 60)
+def print_banner():
+    """Log startup info"""
+    print("=" * 60)
+    print(f"🚀 Yetal Bot Starting...")
+    print(f"⏰ {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"🌐 Render URL: {RENDER_EXTERNAL_URL}")
+    print(f"🤖 Bot Token: {'✅ Set' if BOT_TOKEN else '❌ Missing'}")
+    print("=" * 60)
 
 # Initialize Flask app
-app = Flask(__name__)
+app = flask.Flask(__name__)
 
 # Store bot instance globally
 bot_instance = None
 dispatcher_instance = None
+# "webhook" or "polling", whichever is currently feeding the dispatcher
+ingestion_mode = None
+recent_updates = RecentUpdates()
 
 @app.route('/')
 def home():
@@ -143,19 +129,31 @@ def home():
 @app.route('/health')
 def health_check():
     """Health check endpoint - Render pings this to keep service alive"""
+    profiler.mark_first_response()
     return {
         "status": "healthy",
         "timestamp": datetime.now().isoformat(),
         "service": "yetal-bot",
-        "bot_status": "active" if bot_instance else "initializing"
+        "bot_status": "active" if bot_instance else "initializing",
+        "ingestion_mode": ingestion_mode,
+        "api_latency": latency.snapshot()
     }, 200
 
+@app.route('/startup')
+def startup_report():
+    """Per-import and per-phase startup timings"""
+    return profiler.report(), 200
+
 @app.route(f'/{BOT_TOKEN}', methods=['POST'])
 def webhook():
     """Handle Telegram webhook updates"""
+    # Still warming up: Telegram retries non-2xx deliveries later
+    if dispatcher_instance is None:
+        return 'starting', 503
+
     try:
         # Parse update
-        update_data = request.get_json()
+        update_data = flask.request.get_json()
         
         if update_data:
             # Create update object
@@ -163,7 +161,7 @@ def webhook():
             update = Update.de_json(update_data, bot_instance)
             
             # Process update
-            dispatcher_instance.process_update(update)
+            dispatch_update(update)
             
             return 'ok', 200
         else:
@@ -172,562 +170,123 @@ def webhook():
     except Exception as e:
         print(f"❌ Webhook error: {e}")
         return 'error', 500
-def start(update, context):
-    """Send a welcome message with inline keyboard"""
-    keyboard = [
-        [InlineKeyboardButton("🔥 Daily Subscription Promo", callback_data='daily_promo')],
-        [InlineKeyboardButton("ℹ️ About yetal", callback_data='about')],
-    ]
-
-    keyboard.append([InlineKeyboardButton("📞 Contact Info", callback_data='contact')])
-    
-    if WEBSITE_URL and WEBSITE_URL.startswith('http'):
-        keyboard.append([InlineKeyboardButton("🌐 Visit Website", url=WEBSITE_URL)])
-    if REGISTRATION_BOT_URL and REGISTRATION_BOT_URL.startswith('http'):
-        keyboard.append([InlineKeyboardButton("📱 If u are a shop owner use this to register", url=REGISTRATION_BOT_URL)])
-    else:
-        keyboard.append([InlineKeyboardButton("📱 If u are a shop owner use this to register", callback_data='register_info')])
-    
-    reply_markup = InlineKeyboardMarkup(keyboard)
-
-    welcome_text = f"""
-*✨ hi i'm Yetal*
-
-🔎 *pick your option*
-
-• 🔥 *Daily subscription = daily offers*
-• ℹ️ About yetal= Information about yetal
-• 📞 Contact us = customer support
-• 🌐 Visit website = explore yetals website   
-• 📱 if u are a shop owner use this to register = This is for shop owners  
-
-
-Use the buttons below to explore Yetal 👇
-"""
-
-    update.message.reply_text(
-        welcome_text,
-        reply_markup=reply_markup,
-        parse_mode=ParseMode.MARKDOWN
-    )
-def show_daily_promo(update, context):
-    query = update.callback_query
-    query.answer()
-
-    promo_text = """
-🔥 *Daily First Subscribers Rush – Win Big with Every Purchase!* 🔥
-
-⏳ *Duration:* 5 Days  
-📅 *Runs:* Every Day  
-
-🎯 *How It Works*
-• Winners are selected strictly by *subscription time*
-• First-come, first-served (exact timestamp)
-• Every buyer gets a *15% discount* 🎉
-
-🏆 *Daily Prize Tiers*
-
-🥇 *Top 2 Fastest Subscribers*
-🎁 Extra chewing gum + chocolate prize pack  
-💰 Value: ~1,000 ETB each
-
-🥈 *Next 3 Subscribers (3–5)*
-🍫 Chocolate prize pack  
-💰 Value: ~500 ETB each
-
-🥉 *Next 20 Subscribers (6–25)*
-🎁 Assorted products or vouchers  
-💰 Value: ~250 ETB each
-
-✅ *All Other Subscribers*
-• Guaranteed **15% discount** (cash or in-kind)
-
-📌 *Important Notes*
-• Total daily winners: **25**
-• Unlimited participants
-• Prizes reset every day
-• 100% transparent & fair (timestamp-based)
-
-🚀 *Subscribe early every day to win BIG!*
-"""
-
-    keyboard = [
-        [InlineKeyboardButton("📱 Subscribe / Buy Now", url=WEBSITE_URL)],
-        [InlineKeyboardButton("🔙 Back to Main Menu", callback_data='main_menu')]
-    ]
-
-    reply_markup = InlineKeyboardMarkup(keyboard)
-
-    query.edit_message_text(
-        promo_text,
-        reply_markup=reply_markup,
-        parse_mode=ParseMode.MARKDOWN
-    )
-
-def show_rewards(update, context):
-    """Show rewards program information"""
-    query = update.callback_query
-    query.answer()
-    
-    rewards_text = """
-🌟 *Why Use Yetal?* 🌟
-
-Yetal is built to make searching smarter and business discovery easier.
-
-🔍 *For Users*
-• Find products & services instantly  
-• Compare offers from different sellers  
-• Discover trusted local businesses  
-• Save time & effort  
-
-🏪 *For Businesses*
-• Advertise without building a website  
-• Appear in user searches  
-• Reach customers by location & category  
-• Affordable promotion plans  
-
-📈 *Why It Works*
-• Search-based discovery  
-• Real users, real businesses  
-• Designed for Ethiopia  
-
-Yetal connects people with what they need — faster.
-"""
-
-    
-    keyboard = [[InlineKeyboardButton("🔙 Back to Main Menu", callback_data='main_menu')]]
-    
-    if REGISTRATION_BOT_URL and REGISTRATION_BOT_URL.startswith('http'):
-        keyboard.append([InlineKeyboardButton("📱 If u are a shop owner use this to register", url=REGISTRATION_BOT_URL)])
-    
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
-    query.edit_message_text(
-        rewards_text,
-        reply_markup=reply_markup,
-        parse_mode=ParseMode.MARKDOWN
-    )
-
-def show_discounts(update, context):
-    """Show current discounts and promotions"""
-    query = update.callback_query
-    query.answer()
-    
-    discounts_text = """
-💎 *Special Discounts & Promotions* 💎
-coming soon...
-"""
-    
-    keyboard = [[InlineKeyboardButton("🔙 Back to Main Menu", callback_data='main_menu')]]
-    
-    if WEBSITE_URL and WEBSITE_URL.startswith('http'):
-        keyboard.append([InlineKeyboardButton("🛒 Shop Now", url=WEBSITE_URL)])
-    
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
-    query.edit_message_text(
-        discounts_text,
-        reply_markup=reply_markup,
-        parse_mode=ParseMode.MARKDOWN
-    )
-
-def show_contact(update, context):
-    """Show contact information - SIMPLE VERSION"""
-    query = update.callback_query
-    query.answer()
-    
-    contact_text = f"""
-📞 *Contact Yetal* 📞
-
-Here's how to reach us:
-
-📧 *Email:* {CONTACT_EMAIL or "contact@yetal.com"}
-
-📱 *Phone:* +251 911 234 567
-
-📱 *Telegram Support:* @YetalSupport
-
-🌐 *Website:* {WEBSITE_URL or "https://yetal.com"}
-
-
-
-📧 *For urgent inquiries, please email us directly at:* {CONTACT_EMAIL or "contact@yetal.com"}
-"""
-    
-    keyboard = [
-        [InlineKeyboardButton("🔥 Daily Subscription Promo", callback_data='daily_promo')],
-        [InlineKeyboardButton("ℹ️ About yetal", callback_data='about')],
-
-    ]
-    
-
-    
-    keyboard.append([InlineKeyboardButton("📞 Contact Us", callback_data='contact')])
-    
-    if WEBSITE_URL and WEBSITE_URL.startswith('http'):
-        keyboard.append([InlineKeyboardButton("🌐 Visit Website", url=WEBSITE_URL)])
-    if REGISTRATION_BOT_URL and REGISTRATION_BOT_URL.startswith('http'):
-        keyboard.append([InlineKeyboardButton("📱 If u are a shop owner use this to register", url=REGISTRATION_BOT_URL)])
-    else:
-        keyboard.append([InlineKeyboardButton("📱 If u are a shop owner use this to register", callback_data='register_info')])  
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
-    query.edit_message_text(
-        contact_text,
-        reply_markup=reply_markup,
-        parse_mode=ParseMode.MARKDOWN
-    )
-
-def back_to_main(update, context):
-    """Return to main menu"""
-    query = update.callback_query
-    query.answer()
-    
-    keyboard = [
-        [InlineKeyboardButton("🔥 Daily Subscription Promo", callback_data='daily_promo')],
-        [InlineKeyboardButton("ℹ️ About yetal", callback_data='about')],
-
-    ]
-    
-
-    
-    keyboard.append([InlineKeyboardButton("📞 Contact Us", callback_data='contact')])
-    
-    if WEBSITE_URL and WEBSITE_URL.startswith('http'):
-        keyboard.append([InlineKeyboardButton("🌐 Visit Website", url=WEBSITE_URL)])
-    if REGISTRATION_BOT_URL and REGISTRATION_BOT_URL.startswith('http'):
-        keyboard.append([InlineKeyboardButton("📱 If u are a shop owner use this to register", url=REGISTRATION_BOT_URL)])
-    else:
-        keyboard.append([InlineKeyboardButton("📱 If u are a shop owner use this to register", callback_data='register_info')])  
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
-    main_text = """
-*✨ hi i'm Yetal*
-
-🔎 *pick your option*
-
-• 🔥 *Daily subscription = daily offers*
-• ℹ️ About yetal= Information about yetal
-• 📞 Contact us = customer support
-• 🌐 Visit website = explore yetals website   
-• 📱 if u are a shop owner use this to register = This is for shop owners  
 
+def dispatch_update(update):
+    """Hand an update to the dispatcher, whichever way it arrived"""
+    if not recent_updates.first_time(update.update_id):
+        return
 
-Use the buttons below to explore Yetal 👇
-"""
-    
-    query.edit_message_text(
-        main_text,
-        reply_markup=reply_markup,
-        parse_mode=ParseMode.MARKDOWN
-    )
-def showabout(update, context):
-    """Detailed information about Yetal - FIXED VERSION"""
-    query = update.callback_query
-    query.answer()
-    
-    about_text = """
-🔎 *About Yetal – Ethiopia's Digital Search Hub* 🔎
-
-🌍 *Our Purpose*
-Yetal was created to solve one problem:
-*People struggle to find the right products and services online.*
-
-We make discovery simple.
-
-🎯 *What We Do*
-• Index shops, products & services  
-• Help users search & compare  
-• Promote businesses
-• Connect buyers directly with sellers  
-
-🏪 *Who Uses Yetal?*
-• Customers searching for options  
-• Shops wanting visibility  
-• Service providers advertising locally  
-
-🔒 *Trust & Transparency*
-• Verified business listings  
-• Clear contact information  
-• No hidden transactions  
-• User-focused design  
-
-🚀 *Our Vision*
-To become Ethiopia's most trusted search and discovery platform.
-"""
-
-    keyboard = [
-        [InlineKeyboardButton("🔥 Daily Subscription Promo", callback_data='daily_promo')],
-        [InlineKeyboardButton("ℹ️ About yetal", callback_data='about')],
-        [InlineKeyboardButton("📞 Contact Us", callback_data='contact')],
-    ]
-    
-    if WEBSITE_URL and WEBSITE_URL.startswith('http'):
-        keyboard.append([InlineKeyboardButton("🌐 Visit Website", url=WEBSITE_URL)])
-    if REGISTRATION_BOT_URL and REGISTRATION_BOT_URL.startswith('http'):
-        keyboard.append([InlineKeyboardButton("📱 If u are a shop owner use this to register", url=REGISTRATION_BOT_URL)])
-    else:
-        keyboard.append([InlineKeyboardButton("📱 If u are a shop owner use this to register", callback_data='register_info')])
-    
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
-    query.edit_message_text(
-        about_text,
-        reply_markup=reply_markup,
-        parse_mode=ParseMode.MARKDOWN
-    )
-def about_command(update, context):
-    """Handle /about command"""
-    update.message.reply_text(
-        """
-🔎 *About Yetal – Ethiopia's Digital Search Hub* 🔎
-
-🌍 *Our Purpose*
-Yetal was created to solve one problem:
-*People struggle to find the right products and services online.*
-
-We make discovery simple.
-
-🎯 *What We Do*
-• Index shops, products & services  
-• Help users search & compare  
-• Promote businesses
-• Connect buyers directly with sellers  
-
-🏪 *Who Uses Yetal?*
-• Customers searching for options  
-• Shops wanting visibility  
-• Service providers advertising locally  
-
-🔒 *Trust & Transparency*
-• Verified business listings  
-• Clear contact information  
-• No hidden transactions  
-• User-focused design  
-
-🚀 *Our Vision*
-To become Ethiopia's most trusted search and discovery platform.
-""",
-        parse_mode=ParseMode.MARKDOWN
-    )
-
-def showabout(update, context):
-    """Handle about button callback - FIXED VERSION"""
-    query = update.callback_query
-    query.answer()
-    
-    about_text = """
-🔎 *About Yetal – Ethiopia's Digital Search Hub* 🔎
-
-🌍 *Our Purpose*
-Yetal was created to solve one problem:
-*People struggle to find the right products and services online.*
-
-We make discovery simple.
-
-🎯 *What We Do*
-• Index shops, products & services  
-• Help users search & compare  
-• Promote businesses
-• Connect buyers directly with sellers  
-
-🏪 *Who Uses Yetal?*
-• Customers searching for options  
-• Shops wanting visibility  
-• Service providers advertising locally  
-
-🔒 *Trust & Transparency*
-• Verified business listings  
-• Clear contact information  
-• No hidden transactions  
-• User-focused design  
-
-🚀 *Our Vision*
-To become Ethiopia's most trusted search and discovery platform.
-"""
-
-    keyboard = [
-        [InlineKeyboardButton("🔥 Daily Subscription Promo", callback_data='daily_promo')],
-        [InlineKeyboardButton("ℹ️ About yetal", callback_data='about')],
-        [InlineKeyboardButton("📞 Contact Us", callback_data='contact')],
-    ]
-    
-    if WEBSITE_URL and WEBSITE_URL.startswith('http'):
-        keyboard.append([InlineKeyboardButton("🌐 Visit Website", url=WEBSITE_URL)])
-    if REGISTRATION_BOT_URL and REGISTRATION_BOT_URL.startswith('http'):
-        keyboard.append([InlineKeyboardButton("📱 If u are a shop owner use this to register", url=REGISTRATION_BOT_URL)])
-    else:
-        keyboard.append([InlineKeyboardButton("📱 If u are a shop owner use this to register", callback_data='register_info')])
-    
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
-    query.edit_message_text(
-        about_text,
-        reply_markup=reply_markup,
-        parse_mode=ParseMode.MARKDOWN
-    )
-def help_command(update, context):
-    """Help command with all available commands"""
-    help_text = """
-🆘 *Yetal Bot Help* 🆘
-
-Here are all available commands:
-
-📋 *Main Commands:*
-• /start - Welcome message and main menu
-• /about - Learn about Yetal
-• /contact - Contact information
-• /register - Get registration bot link
-• /help - Show this help message
-
-📞 *Contact Information:*
-• Email: yetal@gmail.com
-• Phone: +251 911 234 565
-• Telegram: @YetalSupport
-• Website: https://yetal.com
-
-*We're here 24/7 to assist you!* 🌙
-"""
-    
-    update.message.reply_text(
-        help_text,
-        parse_mode=ParseMode.MARKDOWN
-    )
-
-def register(update, context):
-    """Registration information"""
-    register_text = """
-📱 *Register Your Business on Yetal* 📱
-
-Get discovered by customers searching every day.
-
-🚀 *Why Register?*
-• 🔍 Appear in search results  
-• 📍 Reach local customers  
-• 📢 Promote your services or products  
-• 📈 Increase visibility & inquiries  
-
-📝 *How It Works*
-1. Register your business  
-2. Add products or services   
-3. Customers find & contact you directly  
-
-⏱️ Registration takes less than 10 minutes.
-"""
-    
-    keyboard = []
-    
-    if REGISTRATION_BOT_URL and REGISTRATION_BOT_URL.startswith('http'):
-        keyboard.append([InlineKeyboardButton("🤖 Start Registration", url=REGISTRATION_BOT_URL)])
-    else:
-        keyboard.append([InlineKeyboardButton("🤖 Start Registration", callback_data='register_info')])
-    
-    keyboard.append([InlineKeyboardButton("📞 Contact Support", callback_data='contact')])
-    keyboard.append([InlineKeyboardButton("🔙 Back to Main", callback_data='main_menu')])
-    
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
-    update.message.reply_text(
-        register_text,
-        reply_markup=reply_markup,
-        parse_mode=ParseMode.MARKDOWN
-    )
-
-def register_info(update, context):
-    """Show registration info when URL is invalid"""
-    query = update.callback_query
-    query.answer()
-    
-    info_text = f"""
-📱 *Registration Information* 📱
+    stats.request_started()
+    try:
+        dispatcher_instance.process_update(update)
+    finally:
+        stats.request_finished()
+
+def webhook_healthy(info, webhook_url, since):
+    """Whether Telegram is delivering to our webhook, judging only errors after `since`"""
+    if info.url != webhook_url:
+        # Pointed elsewhere (or removed) on purpose, not ours to take back
+        return True
+    if not info.last_error_date or not info.pending_update_count:
+        return True
+    # Errors from before the webhook was (re)set belong to the previous outage
+    window_start = max(since, time.time() - 2 * WEBHOOK_CHECK_INTERVAL)
+    return info.last_error_date.timestamp() <= window_start
 
-To register your business on Yetal:
+def public_url_reachable():
+    """Check that our public /health answers, i.e. a webhook could work again"""
+    import requests
 
-*Registration Bot:* {REGISTRATION_BOT_URL or "Not available"}
+    try:
+        return requests.get(f"{RENDER_EXTERNAL_URL}/health", timeout=5).ok
+    except Exception:
+        return False
 
-*Contact for Help:*
-• Email: {CONTACT_EMAIL or "contact@yetal.com"}
-• Phone: +251 911 234 567
-• Telegram: @YetalSupport
+def run_polling():
+    """Ingest updates with long polling only"""
+    global ingestion_mode
+    ingestion_mode = "polling"
+    Poller(bot_instance, dispatch_update, UPDATE_OFFSET_PATH, workers=POLL_WORKERS).run()
 
-*Website:* {WEBSITE_URL or "https://yetal.com"}
+def webhook_watchdog(webhook_url, webhook_set_at):
+    """Fail over to long polling while Telegram can't reach the webhook"""
+    global ingestion_mode
+    poller = Poller(bot_instance, dispatch_update, UPDATE_OFFSET_PATH, workers=POLL_WORKERS)
 
-We'll help you get registered as soon as possible!
-"""
-    
-    keyboard = [
-        [InlineKeyboardButton("🔙 Back to Main Menu", callback_data='main_menu')],
-        [InlineKeyboardButton("📞 Contact Support", callback_data='contact')]
-    ]
-    
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
-    query.edit_message_text(
-        info_text,
-        reply_markup=reply_markup,
-        parse_mode=ParseMode.MARKDOWN
-    )
-def contact_command(update, context):
-    contact_text = f"""
-📞 *Contact Yetal* 📞
-
-📧 *Email:* {CONTACT_EMAIL}
-📱 *Phone:* +251 911 234 567
-📱 *Telegram:* @YetalSupport
-🌐 *Website:* {WEBSITE_URL}
-"""
-
-    update.message.reply_text(
-        contact_text,
-        parse_mode=ParseMode.MARKDOWN
-    )
+    while True:
+        time.sleep(WEBHOOK_CHECK_INTERVAL)
+        try:
+            if ingestion_mode == "webhook":
+                info = bot_instance.get_webhook_info()
+                if webhook_healthy(info, webhook_url, webhook_set_at):
+                    continue
+
+                print(f"⚠️ Webhook failing ({info.last_error_message}, {info.pending_update_count} pending), switching to polling")
+                # getUpdates is refused while a webhook is set
+                bot_instance.delete_webhook()
+                ingestion_mode = "polling"
+                print(f"✅ Drained {poller.drain()} queued updates")
+
+            # Still polling (also after an error above): keep going until
+            # our public URL answers again
+            while not public_url_reachable():
+                poller.run(seconds=WEBHOOK_CHECK_INTERVAL)
+
+            bot_instance.set_webhook(webhook_url)
+            webhook_set_at = time.time()
+            ingestion_mode = "webhook"
+            print(f"✅ Webhook restored: {webhook_url}")
 
-def unknown(update, context):
-    """Handle unknown commands"""
-    update.message.reply_text(
-        "❌ Sorry, I didn't understand that command.\n\n"
-        "Try /start to begin or /help for available commands.",
-        parse_mode=ParseMode.MARKDOWN
-    )
+        except Exception as e:
+            print(f"⚠️ Webhook watchdog error: {e}")
 
 def setup_bot():
     """Set up Telegram bot with webhook"""
-    global bot_instance, dispatcher_instance
+    global bot_instance, dispatcher_instance, ingestion_mode
     
     try:
-        # Create bot instance
-        bot_instance = Bot(token=BOT_TOKEN)
-        
-        # Create updater and dispatcher
-        updater = Updater(bot=bot_instance, use_context=True)
+        with profiler.phase("telegram_import"):
+            telegram = profiler.load("telegram")
+            telegram_ext = profiler.load("telegram.ext")
+            from api_client import TrackedRequest
+            from handlers import register_handlers
+            from sessions import UnstoredData
+
+        with profiler.phase("dispatcher"):
+            # Create bot instance
+            bot = telegram.Bot(token=BOT_TOKEN, request=TrackedRequest(con_pool_size=12))
+
+            # Create updater and dispatcher
+            updater = telegram_ext.Updater(bot=bot, use_context=True)
+            # Session state lives in handlers.sessions, not in per-user dicts
+            # that grow with every user who ever wrote to the bot
+            updater.dispatcher.user_data = UnstoredData()
+            updater.dispatcher.chat_data = UnstoredData()
+            register_handlers(updater.dispatcher)
+
+        # Publish only once fully wired, the webhook route checks for it
+        bot_instance = bot
         dispatcher_instance = updater.dispatcher
-        
-        # Add command handlers
-        dispatcher_instance.add_handler(CommandHandler("start", start))
-        dispatcher_instance.add_handler(CommandHandler("about", about_command))
-        dispatcher_instance.add_handler(CommandHandler("help", help_command))
-        dispatcher_instance.add_handler(CommandHandler("contact", contact_command))
-        # Add callback query handlers
-        dispatcher_instance.add_handler(CallbackQueryHandler(show_rewards, pattern='^rewards$'))
-        dispatcher_instance.add_handler(CallbackQueryHandler(show_daily_promo, pattern='^daily_promo$'))
-        dispatcher_instance.add_handler(CallbackQueryHandler(show_discounts, pattern='^discounts$'))
-        dispatcher_instance.add_handler(CallbackQueryHandler(show_contact, pattern='^contact$'))
-        dispatcher_instance.add_handler(CallbackQueryHandler(showabout, pattern='^about$'))
-        dispatcher_instance.add_handler(CallbackQueryHandler(back_to_main, pattern='^main_menu$'))
-        dispatcher_instance.add_handler(CallbackQueryHandler(register_info, pattern='^register_info$'))
-        
-        # Handle unknown commands
-        dispatcher_instance.add_handler(MessageHandler(Filters.command, unknown))
-        
-        # Set webhook
+
         webhook_url = f"{RENDER_EXTERNAL_URL}/{BOT_TOKEN}"
-        bot_instance.delete_webhook()
-        time.sleep(1)
-        bot_instance.set_webhook(webhook_url)
-        
+        with profiler.phase("set_webhook"):
+            bot_instance.delete_webhook()
+            if UPDATE_MODE != "polling":
+                time.sleep(1)
+                bot_instance.set_webhook(webhook_url)
+
         print(f"✅ Bot setup complete!")
         print(f"🤖 Bot: @{bot_instance.get_me().username}")
-        print(f"🌐 Webhook: {webhook_url}")
+
+        if UPDATE_MODE == "polling":
+            threading.Thread(target=run_polling, daemon=True).start()
+            print("🔁 Receiving updates by long polling")
+        else:
+            ingestion_mode = "webhook"
+            print(f"🌐 Webhook: {webhook_url}")
+            if UPDATE_MODE == "auto":
+                threading.Thread(target=webhook_watchdog, args=(webhook_url, time.time()), daemon=True).start()
+                print("✅ Webhook watchdog started")
         
         return True
         
@@ -735,6 +294,15 @@ def setup_bot():
         print(f"❌ Bot setup failed: {e}")
         return False
 
+def load_indexes():
+    """Build the search and shop indexes ahead of the first query"""
+    try:
+        from handlers import catalog, shop_locator
+        catalog.reload_if_changed()
+        shop_locator.reload_if_changed()
+    except Exception as e:
+        print(f"⚠️ Index loading failed: {e}")
+
 def start_flask():
     """Start Flask server"""
     port = int(os.environ.get("PORT", 5000))
@@ -750,6 +318,8 @@ def start_flask():
 
 def keep_alive():
     """Background thread to keep the service alive"""
+    import requests
+
     while True:
         try:
             requests.get(f"{RENDER_EXTERNAL_URL}/health", timeout=5)
@@ -759,6 +329,38 @@ def keep_alive():
 
         time.sleep(240) 
 
+def start_background_tasks():
+    """Set up the bot and start helper threads"""
+    print_banner()
+
+    # Setup bot
+    print("🔄 Setting up Telegram bot...")
+    with profiler.phase("setup_bot"):
+        ok = setup_bot()
+    if not ok:
+        print("❌ Bot setup failed, but continuing with Flask...")
+
+    # Separate from setup_bot() so a bad data file can't take the bot down
+    with profiler.phase("indexes"):
+        load_indexes()
+
+    # Start keep-alive thread
+    keep_alive_thread = threading.Thread(target=keep_alive, daemon=True)
+    keep_alive_thread.start()
+    print("✅ Keep-alive thread started")
+
+    # Start latency probe thread
+    if LATENCY_PROBE_INTERVAL > 0:
+        probe_thread = threading.Thread(
+            target=probe_loop, args=(TELEGRAM_API_URL, LATENCY_PROBE_INTERVAL), daemon=True
+        )
+        probe_thread.start()
+        print("✅ Latency probe thread started")
+
+    report = profiler.report()
+    print(f"⏱️ Startup: first response {report['time_to_first_response_ms']} ms, "
+          f"imports {report['imports_ms']}, phases {report['phases']}")
+
 def main():
     """Main function to start everything"""
     print("=" * 60)
@@ -770,19 +372,15 @@ def main():
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
         level=logging.INFO
     )
-    
-    # Setup bot
-    print("🔄 Setting up Telegram bot...")
-    if not setup_bot():
-        print("❌ Bot setup failed, but continuing with Flask...")
-    
-    # Start keep-alive thread
-    keep_alive_thread = threading.Thread(target=keep_alive, daemon=True)
-    keep_alive_thread.start()
-    print("✅ Keep-alive thread started")
+
+    if STARTUP_MODE == "blocking":
+        start_background_tasks()
+    else:
+        # Bind the port first, the bot comes up while /health already answers
+        threading.Thread(target=start_background_tasks, daemon=True).start()
     
     # Start Flask server (this will run forever)
     start_flask()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
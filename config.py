@@ -0,0 +1,66 @@
+import os
+
+# python-dotenv is optional in production, where Render injects the environment
+try:
+    from dotenv import load_dotenv
+except ImportError:
+    load_dotenv = None
+
+# Load environment variables
+if load_dotenv:
+    load_dotenv()
+BOT_VERSION = "1.2.0"
+BOT_TOKEN = os.getenv("BOT_TOKEN")
+ADMIN_CODE = os.getenv("ADMIN_CODE")
+REGISTRATION_BOT_URL = os.getenv("REGISTRATION_BOT_URL", "https://t.me/YourRegistrationBot")
+CONTACT_EMAIL = os.getenv("CONTACT_EMAIL", "contact@yetal.com")
+WEBSITE_URL = os.getenv("WEBSITE_URL", "https://yetal.com")
+RENDER_EXTERNAL_URL = os.getenv("RENDER_EXTERNAL_URL", "https://yetalads.onrender.com")
+MAX_PROFILE_SECONDS = 60
+# Seconds between active latency probes to the Bot API host, 0 disables them
+LATENCY_PROBE_INTERVAL = int(os.getenv("LATENCY_PROBE_INTERVAL", "60"))
+TELEGRAM_API_URL = "https://api.telegram.org"
+
+# Validate URLs
+def validate_url(url):
+    """Validate and clean URL"""
+    if not url:
+        return None
+    url = url.strip()
+    if url.startswith("http://") or url.startswith("https://"):
+        return url
+    elif url.startswith("t.me/"):
+        return f"https://{url}"
+    else:
+        return f"https://{url}"
+
+# Validate all URLs
+REGISTRATION_BOT_URL = validate_url(REGISTRATION_BOT_URL)
+WEBSITE_URL = validate_url(WEBSITE_URL)
+
+# Business/product catalog for inline search (JSON list of listings)
+CATALOG_PATH = os.getenv("CATALOG_PATH", "catalog.json")
+# Seconds inline search results are cached, both here and by Telegram
+SEARCH_CACHE_TTL = int(os.getenv("SEARCH_CACHE_TTL", "60"))
+# Registered shops with coordinates (CSV: id,name,category,lat,lon,address,phone)
+SHOPS_PATH = os.getenv("SHOPS_PATH", "shops.csv")
+# How many shops "shops near me" returns
+NEAREST_SHOPS = int(os.getenv("NEAREST_SHOPS", "5"))
+# SQLite file backing per-user sessions, and how many stay cached in memory
+SESSIONS_PATH = os.getenv("SESSIONS_PATH", "sessions.db")
+SESSION_CACHE_SIZE = int(os.getenv("SESSION_CACHE_SIZE", "10000"))
+# How updates reach the bot: "webhook", "polling", or "auto" (webhook, falling
+# back to long polling while Telegram reports webhook delivery errors)
+UPDATE_MODE = os.getenv("UPDATE_MODE", "auto")
+# File holding the next getUpdates offset, so restarts never repeat an update
+UPDATE_OFFSET_PATH = os.getenv("UPDATE_OFFSET_PATH", "update_offset.txt")
+# Threads processing a polled batch (updates of one chat stay in order)
+POLL_WORKERS = int(os.getenv("POLL_WORKERS", "8"))
+# Seconds between webhook health checks in auto mode
+WEBHOOK_CHECK_INTERVAL = int(os.getenv("WEBHOOK_CHECK_INTERVAL", "60"))
+
+# Startup mode: "fast" serves HTTP first and sets the bot up in the background,
+# "blocking" finishes bot setup before the server starts
+STARTUP_MODE = os.getenv("STARTUP_MODE", "fast")
+# Budget for time-to-first-response, checked by tests/test_startup.py
+STARTUP_BUDGET_MS = int(os.getenv("STARTUP_BUDGET_MS", "1500"))
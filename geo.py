@@ -0,0 +1,298 @@
+import io
+import os
+import csv
+import math
+import time
+import threading
+from array import array
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = 111.32
+# Grid cell size in degrees, ~1.1 km north-south
+CELL_SIZE = 0.01
+# Don't look further than this for neighbours
+MAX_RADIUS_KM = 50.0
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+class GridIndex:
+    """Uniform lat/lon grid with k-nearest-neighbour search
+
+    Only what the search needs is kept, in flat arrays indexed by slot:
+    coordinates, a category code and the byte offset of the shop's row in
+    the shop file, which is where names, addresses and phones are read from
+    for the few shops actually returned. Each grid cell holds an array of
+    slots. Shops can be added and removed in place, which lets a changed shop
+    file be applied as a diff instead of a full rebuild.
+    """
+
+    def __init__(self, cell_size=CELL_SIZE):
+        self.cell_size = cell_size
+        self.lats = array("d")
+        self.lons = array("d")
+        self.offsets = array("q")
+        self.category_codes = array("I")
+        self.ids = []
+        self.free = []
+        self.cells = {}
+        self.slot_by_id = {}
+        # Distinct categories, shared by every shop in them
+        self.categories = []
+        self.code_by_category = {}
+
+    def __len__(self):
+        return len(self.slot_by_id)
+
+    def cell(self, lat, lon):
+        return (int(math.floor(lat / self.cell_size)), int(math.floor(lon / self.cell_size)))
+
+    def category_code(self, category):
+        code = self.code_by_category.get(category)
+        if code is None:
+            code = self.code_by_category[category] = len(self.categories)
+            self.categories.append(category)
+        return code
+
+    def entry(self, slot):
+        """(lat, lon, category) stored for a slot"""
+        return self.lats[slot], self.lons[slot], self.categories[self.category_codes[slot]]
+
+    def add(self, shop_id, lat, lon, category, offset):
+        code = self.category_code(category)
+        if self.free:
+            slot = self.free.pop()
+            self.lats[slot] = lat
+            self.lons[slot] = lon
+            self.offsets[slot] = offset
+            self.category_codes[slot] = code
+            self.ids[slot] = shop_id
+        else:
+            slot = len(self.ids)
+            self.lats.append(lat)
+            self.lons.append(lon)
+            self.offsets.append(offset)
+            self.category_codes.append(code)
+            self.ids.append(shop_id)
+
+        self.cells.setdefault(self.cell(lat, lon), array("l")).append(slot)
+        self.slot_by_id[shop_id] = slot
+
+    def remove(self, shop_id):
+        slot = self.slot_by_id.pop(shop_id)
+        key = self.cell(self.lats[slot], self.lons[slot])
+        members = self.cells[key]
+        members.remove(slot)
+        if not members:
+            del self.cells[key]
+        self.ids[slot] = None
+        self.free.append(slot)
+
+    def nearest(self, lat, lon, k=5, category=None, max_radius_km=MAX_RADIUS_KM):
+        """Return up to k (distance_km, slot) pairs, closest first"""
+        wanted = None
+        if category:
+            wanted = {code for code, name in enumerate(self.categories) if category in name.casefold()}
+
+        cx, cy = self.cell(lat, lon)
+        # Smallest distance covered by one ring of cells around the centre
+        cell_km = self.cell_size * KM_PER_DEGREE * min(1.0, max(math.cos(math.radians(lat)), 0.01))
+        max_ring = int(max_radius_km / cell_km) + 1
+
+        found = []
+        for ring in range(max_ring + 1):
+            for key in ring_cells(cx, cy, ring):
+                for slot in self.cells.get(key, ()):
+                    if wanted is not None and self.category_codes[slot] not in wanted:
+                        continue
+                    distance = haversine_km(lat, lon, self.lats[slot], self.lons[slot])
+                    if distance <= max_radius_km:
+                        found.append((distance, slot))
+
+            # Anything in rings further out is at least ring * cell_km away
+            if len(found) >= k:
+                found.sort(key=lambda item: item[0])
+                if found[k - 1][0] <= ring * cell_km:
+                    break
+
+        found.sort(key=lambda item: item[0])
+        return found[:k]
+
+
+def ring_cells(cx, cy, ring):
+    """Cells at Chebyshev distance `ring` from (cx, cy)"""
+    if ring == 0:
+        yield (cx, cy)
+        return
+    for dx in range(-ring, ring + 1):
+        yield (cx + dx, cy - ring)
+        yield (cx + dx, cy + ring)
+    for dy in range(-ring + 1, ring):
+        yield (cx - ring, cy + dy)
+        yield (cx + ring, cy + dy)
+
+
+def read_record(f):
+    """Read one CSV record from a binary file, following quoted newlines"""
+    record = f.readline()
+    # A newline inside a quoted field leaves an odd number of quotes so far
+    while record.count(b'"') % 2 and record.endswith(b"\n"):
+        record += f.readline()
+    return record
+
+
+def parse_record(record, header):
+    """Turn a raw CSV record into a shop dict, or None if it isn't usable"""
+    values = next(csv.reader(io.StringIO(record.decode("utf-8"), newline="")), [])
+    row = dict(zip(header, values))
+    try:
+        shop = {
+            "id": row["id"].strip(),
+            "name": row["name"].strip(),
+            "category": (row.get("category") or "").strip(),
+            "lat": float(row["lat"]),
+            "lon": float(row["lon"]),
+            "address": (row.get("address") or "").strip(),
+            "phone": (row.get("phone") or "").strip(),
+        }
+    except (KeyError, TypeError, ValueError, AttributeError):
+        # Missing column, short row or bad coordinate
+        return None
+    # Also rejects nan/inf, which float() accepts
+    if not (-90 <= shop["lat"] <= 90 and -180 <= shop["lon"] <= 180):
+        return None
+    if not (shop["id"] and shop["name"]):
+        return None
+    return shop
+
+
+def read_header(f):
+    # utf-8-sig drops the byte-order mark Excel puts in front of the header
+    line = read_record(f).decode("utf-8-sig")
+    return [name.strip() for name in next(csv.reader(io.StringIO(line, newline="")), [])]
+
+
+def read_shops(path):
+    """Yield (byte offset, shop) for each usable row of the shop file
+
+    The file is a CSV with id,name,category,lat,lon[,address,phone] columns.
+    """
+    with open(path, "rb") as f:
+        header = read_header(f)
+        while True:
+            offset = f.tell()
+            record = read_record(f)
+            if not record:
+                return
+            shop = parse_record(record, header)
+            if shop is not None:
+                yield offset, shop
+
+
+def read_shop_at(f, header, offset):
+    """Read the shop whose row starts at `offset` of an open shop file"""
+    f.seek(offset)
+    return parse_record(read_record(f), header)
+
+
+class ShopLocator:
+    """Grid index over the shop file, updated incrementally when it changes
+
+    The index holds coordinates and file offsets only; the details of the
+    shops a query returns are read back from the file.
+    """
+
+    def __init__(self, path, check_interval=30):
+        self.path = path
+        self.check_interval = check_interval
+        self.lock = threading.Lock()
+        self.index = GridIndex()
+        self.mtime = None
+        self.checked = 0
+
+    def reload_if_changed(self, force=False):
+        now = time.time()
+        if not force and now - self.checked < self.check_interval:
+            return
+        self.checked = now
+
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return
+        if mtime == self.mtime:
+            return
+
+        try:
+            # Later rows win when an id repeats
+            entries = {
+                shop["id"]: (offset, shop["lat"], shop["lon"], shop["category"])
+                for offset, shop in read_shops(self.path)
+            }
+        except (OSError, ValueError, csv.Error) as e:
+            # Not UTF-8 (UnicodeDecodeError is a ValueError) or not valid CSV:
+            # keep the current index and skip this version of the file
+            self.mtime = mtime
+            print(f"⚠️ Could not load shops {self.path}: {e}")
+            return
+
+        with self.lock:
+            index = self.index
+            added = removed = 0
+            for shop_id in list(index.slot_by_id):
+                slot = index.slot_by_id[shop_id]
+                entry = entries.get(shop_id)
+                if entry is not None and entry[1:] == index.entry(slot):
+                    # Unchanged position and category; the row may have moved
+                    index.offsets[slot] = entry[0]
+                else:
+                    index.remove(shop_id)
+                    removed += 1
+            for shop_id, (offset, lat, lon, category) in entries.items():
+                if shop_id not in index.slot_by_id:
+                    index.add(shop_id, lat, lon, category, offset)
+                    added += 1
+            self.mtime = mtime
+
+        print(f"✅ Shop index updated: {len(index)} shops (+{added} / -{removed})")
+
+    def nearest(self, lat, lon, k=5, category=None):
+        """Return up to k (distance_km, shop) pairs, closest first"""
+        self.reload_if_changed()
+        category = category.casefold() if category else None
+
+        for attempt in range(2):
+            with self.lock:
+                hits = [
+                    (distance, self.index.ids[slot], self.index.offsets[slot])
+                    for distance, slot in self.index.nearest(lat, lon, k=k, category=category)
+                ]
+            found, stale = self._details(hits)
+            if not stale:
+                break
+            # The file changed since it was indexed, so offsets point at the
+            # wrong rows; pick up the new version and ask again
+            self.reload_if_changed(force=True)
+        return found
+
+    def _details(self, hits):
+        """Read the rows behind index hits; also report whether any were stale"""
+        if not hits:
+            return [], False
+        found = []
+        try:
+            with open(self.path, "rb") as f:
+                header = read_header(f)
+                for distance, shop_id, offset in hits:
+                    shop = read_shop_at(f, header, offset)
+                    if shop is None or shop["id"] != shop_id:
+                        return found, True
+                    found.append((distance, shop))
+        except (OSError, ValueError, csv.Error) as e:
+            print(f"⚠️ Could not read shops {self.path}: {e}")
+            return found, True
+        return found, False
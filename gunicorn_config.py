@@ -3,5 +3,7 @@ bind = "0.0.0.0:10000"
 workers = 2
 threads = 4
 worker_class = "gthread"
-timeout = 120
-keepalive = 5
\ No newline at end of file
+# Outbound Bot API calls are capped at latency.MAX_TIMEOUT (30s), so a worker
+# silent for much longer than that is stuck, not waiting on Telegram
+timeout = 45
+keepalive = 5
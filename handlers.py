@@ -0,0 +1,742 @@
+import hmac
+import threading
+from telegram import (
+    InlineKeyboardButton, InlineKeyboardMarkup, ParseMode, InlineQueryResultArticle, InputTextMessageContent,
+    KeyboardButton, ReplyKeyboardMarkup, ReplyKeyboardRemove, Update,
+)
+from telegram.utils.helpers import escape_markdown
+from telegram.ext import (
+    CommandHandler, MessageHandler, Filters, CallbackQueryHandler, InlineQueryHandler, TypeHandler,
+)
+from config import (
+    ADMIN_CODE, REGISTRATION_BOT_URL, CONTACT_EMAIL, WEBSITE_URL, MAX_PROFILE_SECONDS,
+    CATALOG_PATH, SEARCH_CACHE_TTL, SHOPS_PATH, NEAREST_SHOPS, SESSIONS_PATH, SESSION_CACHE_SIZE,
+)
+from monitoring import stats, timed, sample_profile, format_report, format_profile
+from search import Catalog
+from geo import ShopLocator
+from sessions import SessionStore
+
+# Business/product listings served by inline search
+catalog = Catalog(CATALOG_PATH, cache_ttl=SEARCH_CACHE_TTL)
+# Registered shops with coordinates, for "shops near me"
+shop_locator = ShopLocator(SHOPS_PATH)
+# Per-user navigation state, used instead of the unbounded context.user_data
+sessions = SessionStore(SESSIONS_PATH, max_size=SESSION_CACHE_SIZE)
+# Held while /admin profile is sampling; the sampler slows every other thread
+profiling = threading.Lock()
+
+def start(update, context):
+    """Send a welcome message with inline keyboard"""
+    keyboard = [
+        [InlineKeyboardButton("🔥 Daily Subscription Promo", callback_data='daily_promo')],
+        [InlineKeyboardButton("ℹ️ About yetal", callback_data='about')],
+    ]
+
+    keyboard.append([InlineKeyboardButton("📞 Contact Info", callback_data='contact')])
+    
+    if WEBSITE_URL and WEBSITE_URL.startswith('http'):
+        keyboard.append([InlineKeyboardButton("🌐 Visit Website", url=WEBSITE_URL)])
+    if REGISTRATION_BOT_URL and REGISTRATION_BOT_URL.startswith('http'):
+        keyboard.append([InlineKeyboardButton("📱 If u are a shop owner use this to register", url=REGISTRATION_BOT_URL)])
+    else:
+        keyboard.append([InlineKeyboardButton("📱 If u are a shop owner use this to register", callback_data='register_info')])
+    
+    reply_markup = InlineKeyboardMarkup(keyboard)
+
+    welcome_text = f"""
+*✨ hi i'm Yetal*
+
+🔎 *pick your option*
+
+• 🔥 *Daily subscription = daily offers*
+• ℹ️ About yetal= Information about yetal
+• 📞 Contact us = customer support
+• 🌐 Visit website = explore yetals website   
+• 📱 if u are a shop owner use this to register = This is for shop owners  
+
+
+Use the buttons below to explore Yetal 👇
+"""
+
+    update.message.reply_text(
+        welcome_text,
+        reply_markup=reply_markup,
+        parse_mode=ParseMode.MARKDOWN
+    )
+def show_daily_promo(update, context):
+    query = update.callback_query
+    query.answer()
+
+    promo_text = """
+🔥 *Daily First Subscribers Rush – Win Big with Every Purchase!* 🔥
+
+⏳ *Duration:* 5 Days  
+📅 *Runs:* Every Day  
+
+🎯 *How It Works*
+• Winners are selected strictly by *subscription time*
+• First-come, first-served (exact timestamp)
+• Every buyer gets a *15% discount* 🎉
+
+🏆 *Daily Prize Tiers*
+
+🥇 *Top 2 Fastest Subscribers*
+🎁 Extra chewing gum + chocolate prize pack  
+💰 Value: ~1,000 ETB each
+
+🥈 *Next 3 Subscribers (3–5)*
+🍫 Chocolate prize pack  
+💰 Value: ~500 ETB each
+
+🥉 *Next 20 Subscribers (6–25)*
+🎁 Assorted products or vouchers  
+💰 Value: ~250 ETB each
+
+✅ *All Other Subscribers*
+• Guaranteed **15% discount** (cash or in-kind)
+
+📌 *Important Notes*
+• Total daily winners: **25**
+• Unlimited participants
+• Prizes reset every day
+• 100% transparent & fair (timestamp-based)
+
+🚀 *Subscribe early every day to win BIG!*
+"""
+
+    keyboard = [
+        [InlineKeyboardButton("📱 Subscribe / Buy Now", url=WEBSITE_URL)],
+        [InlineKeyboardButton("🔙 Back to Main Menu", callback_data='main_menu')]
+    ]
+
+    reply_markup = InlineKeyboardMarkup(keyboard)
+
+    query.edit_message_text(
+        promo_text,
+        reply_markup=reply_markup,
+        parse_mode=ParseMode.MARKDOWN
+    )
+
+def show_rewards(update, context):
+    """Show rewards program information"""
+    query = update.callback_query
+    query.answer()
+    
+    rewards_text = """
+🌟 *Why Use Yetal?* 🌟
+
+Yetal is built to make searching smarter and business discovery easier.
+
+🔍 *For Users*
+• Find products & services instantly  
+• Compare offers from different sellers  
+• Discover trusted local businesses  
+• Save time & effort  
+
+🏪 *For Businesses*
+• Advertise without building a website  
+• Appear in user searches  
+• Reach customers by location & category  
+• Affordable promotion plans  
+
+📈 *Why It Works*
+• Search-based discovery  
+• Real users, real businesses  
+• Designed for Ethiopia  
+
+Yetal connects people with what they need — faster.
+"""
+
+    
+    keyboard = [[InlineKeyboardButton("🔙 Back to Main Menu", callback_data='main_menu')]]
+    
+    if REGISTRATION_BOT_URL and REGISTRATION_BOT_URL.startswith('http'):
+        keyboard.append([InlineKeyboardButton("📱 If u are a shop owner use this to register", url=REGISTRATION_BOT_URL)])
+    
+    reply_markup = InlineKeyboardMarkup(keyboard)
+    
+    query.edit_message_text(
+        rewards_text,
+        reply_markup=reply_markup,
+        parse_mode=ParseMode.MARKDOWN
+    )
+
+def show_discounts(update, context):
+    """Show current discounts and promotions"""
+    query = update.callback_query
+    query.answer()
+    
+    discounts_text = """
+💎 *Special Discounts & Promotions* 💎
+coming soon...
+"""
+    
+    keyboard = [[InlineKeyboardButton("🔙 Back to Main Menu", callback_data='main_menu')]]
+    
+    if WEBSITE_URL and WEBSITE_URL.startswith('http'):
+        keyboard.append([InlineKeyboardButton("🛒 Shop Now", url=WEBSITE_URL)])
+    
+    reply_markup = InlineKeyboardMarkup(keyboard)
+    
+    query.edit_message_text(
+        discounts_text,
+        reply_markup=reply_markup,
+        parse_mode=ParseMode.MARKDOWN
+    )
+
+def show_contact(update, context):
+    """Show contact information - SIMPLE VERSION"""
+    query = update.callback_query
+    query.answer()
+    
+    contact_text = f"""
+📞 *Contact Yetal* 📞
+
+Here's how to reach us:
+
+📧 *Email:* {CONTACT_EMAIL or "contact@yetal.com"}
+
+📱 *Phone:* +251 911 234 567
+
+📱 *Telegram Support:* @YetalSupport
+
+🌐 *Website:* {WEBSITE_URL or "https://yetal.com"}
+
+
+
+📧 *For urgent inquiries, please email us directly at:* {CONTACT_EMAIL or "contact@yetal.com"}
+"""
+    
+    keyboard = [
+        [InlineKeyboardButton("🔥 Daily Subscription Promo", callback_data='daily_promo')],
+        [InlineKeyboardButton("ℹ️ About yetal", callback_data='about')],
+
+    ]
+    
+
+    
+    keyboard.append([InlineKeyboardButton("📞 Contact Us", callback_data='contact')])
+    
+    if WEBSITE_URL and WEBSITE_URL.startswith('http'):
+        keyboard.append([InlineKeyboardButton("🌐 Visit Website", url=WEBSITE_URL)])
+    if REGISTRATION_BOT_URL and REGISTRATION_BOT_URL.startswith('http'):
+        keyboard.append([InlineKeyboardButton("📱 If u are a shop owner use this to register", url=REGISTRATION_BOT_URL)])
+    else:
+        keyboard.append([InlineKeyboardButton("📱 If u are a shop owner use this to register", callback_data='register_info')])  
+    reply_markup = InlineKeyboardMarkup(keyboard)
+    
+    query.edit_message_text(
+        contact_text,
+        reply_markup=reply_markup,
+        parse_mode=ParseMode.MARKDOWN
+    )
+
+def back_to_main(update, context):
+    """Return to main menu"""
+    query = update.callback_query
+    query.answer()
+    
+    keyboard = [
+        [InlineKeyboardButton("🔥 Daily Subscription Promo", callback_data='daily_promo')],
+        [InlineKeyboardButton("ℹ️ About yetal", callback_data='about')],
+
+    ]
+    
+
+    
+    keyboard.append([InlineKeyboardButton("📞 Contact Us", callback_data='contact')])
+    
+    if WEBSITE_URL and WEBSITE_URL.startswith('http'):
+        keyboard.append([InlineKeyboardButton("🌐 Visit Website", url=WEBSITE_URL)])
+    if REGISTRATION_BOT_URL and REGISTRATION_BOT_URL.startswith('http'):
+        keyboard.append([InlineKeyboardButton("📱 If u are a shop owner use this to register", url=REGISTRATION_BOT_URL)])
+    else:
+        keyboard.append([InlineKeyboardButton("📱 If u are a shop owner use this to register", callback_data='register_info')])  
+    reply_markup = InlineKeyboardMarkup(keyboard)
+    
+    main_text = """
+*✨ hi i'm Yetal*
+
+🔎 *pick your option*
+
+• 🔥 *Daily subscription = daily offers*
+• ℹ️ About yetal= Information about yetal
+• 📞 Contact us = customer support
+• 🌐 Visit website = explore yetals website   
+• 📱 if u are a shop owner use this to register = This is for shop owners  
+
+
+Use the buttons below to explore Yetal 👇
+"""
+    
+    query.edit_message_text(
+        main_text,
+        reply_markup=reply_markup,
+        parse_mode=ParseMode.MARKDOWN
+    )
+def showabout(update, context):
+    """Detailed information about Yetal - FIXED VERSION"""
+    query = update.callback_query
+    query.answer()
+    
+    about_text = """
+🔎 *About Yetal – Ethiopia's Digital Search Hub* 🔎
+
+🌍 *Our Purpose*
+Yetal was created to solve one problem:
+*People struggle to find the right products and services online.*
+
+We make discovery simple.
+
+🎯 *What We Do*
+• Index shops, products & services  
+• Help users search & compare  
+• Promote businesses
+• Connect buyers directly with sellers  
+
+🏪 *Who Uses Yetal?*
+• Customers searching for options  
+• Shops wanting visibility  
+• Service providers advertising locally  
+
+🔒 *Trust & Transparency*
+• Verified business listings  
+• Clear contact information  
+• No hidden transactions  
+• User-focused design  
+
+🚀 *Our Vision*
+To become Ethiopia's most trusted search and discovery platform.
+"""
+
+    keyboard = [
+        [InlineKeyboardButton("🔥 Daily Subscription Promo", callback_data='daily_promo')],
+        [InlineKeyboardButton("ℹ️ About yetal", callback_data='about')],
+        [InlineKeyboardButton("📞 Contact Us", callback_data='contact')],
+    ]
+    
+    if WEBSITE_URL and WEBSITE_URL.startswith('http'):
+        keyboard.append([InlineKeyboardButton("🌐 Visit Website", url=WEBSITE_URL)])
+    if REGISTRATION_BOT_URL and REGISTRATION_BOT_URL.startswith('http'):
+        keyboard.append([InlineKeyboardButton("📱 If u are a shop owner use this to register", url=REGISTRATION_BOT_URL)])
+    else:
+        keyboard.append([InlineKeyboardButton("📱 If u are a shop owner use this to register", callback_data='register_info')])
+    
+    reply_markup = InlineKeyboardMarkup(keyboard)
+    
+    query.edit_message_text(
+        about_text,
+        reply_markup=reply_markup,
+        parse_mode=ParseMode.MARKDOWN
+    )
+def about_command(update, context):
+    """Handle /about command"""
+    update.message.reply_text(
+        """
+🔎 *About Yetal – Ethiopia's Digital Search Hub* 🔎
+
+🌍 *Our Purpose*
+Yetal was created to solve one problem:
+*People struggle to find the right products and services online.*
+
+We make discovery simple.
+
+🎯 *What We Do*
+• Index shops, products & services  
+• Help users search & compare  
+• Promote businesses
+• Connect buyers directly with sellers  
+
+🏪 *Who Uses Yetal?*
+• Customers searching for options  
+• Shops wanting visibility  
+• Service providers advertising locally  
+
+🔒 *Trust & Transparency*
+• Verified business listings  
+• Clear contact information  
+• No hidden transactions  
+• User-focused design  
+
+🚀 *Our Vision*
+To become Ethiopia's most trusted search and discovery platform.
+""",
+        parse_mode=ParseMode.MARKDOWN
+    )
+
+def showabout(update, context):
+    """Handle about button callback - FIXED VERSION"""
+    query = update.callback_query
+    query.answer()
+    
+    about_text = """
+🔎 *About Yetal – Ethiopia's Digital Search Hub* 🔎
+
+🌍 *Our Purpose*
+Yetal was created to solve one problem:
+*People struggle to find the right products and services online.*
+
+We make discovery simple.
+
+🎯 *What We Do*
+• Index shops, products & services  
+• Help users search & compare  
+• Promote businesses
+• Connect buyers directly with sellers  
+
+🏪 *Who Uses Yetal?*
+• Customers searching for options  
+• Shops wanting visibility  
+• Service providers advertising locally  
+
+🔒 *Trust & Transparency*
+• Verified business listings  
+• Clear contact information  
+• No hidden transactions  
+• User-focused design  
+
+🚀 *Our Vision*
+To become Ethiopia's most trusted search and discovery platform.
+"""
+
+    keyboard = [
+        [InlineKeyboardButton("🔥 Daily Subscription Promo", callback_data='daily_promo')],
+        [InlineKeyboardButton("ℹ️ About yetal", callback_data='about')],
+        [InlineKeyboardButton("📞 Contact Us", callback_data='contact')],
+    ]
+    
+    if WEBSITE_URL and WEBSITE_URL.startswith('http'):
+        keyboard.append([InlineKeyboardButton("🌐 Visit Website", url=WEBSITE_URL)])
+    if REGISTRATION_BOT_URL and REGISTRATION_BOT_URL.startswith('http'):
+        keyboard.append([InlineKeyboardButton("📱 If u are a shop owner use this to register", url=REGISTRATION_BOT_URL)])
+    else:
+        keyboard.append([InlineKeyboardButton("📱 If u are a shop owner use this to register", callback_data='register_info')])
+    
+    reply_markup = InlineKeyboardMarkup(keyboard)
+    
+    query.edit_message_text(
+        about_text,
+        reply_markup=reply_markup,
+        parse_mode=ParseMode.MARKDOWN
+    )
+def help_command(update, context):
+    """Help command with all available commands"""
+    help_text = """
+🆘 *Yetal Bot Help* 🆘
+
+Here are all available commands:
+
+📋 *Main Commands:*
+• /start - Welcome message and main menu
+• /about - Learn about Yetal
+• /contact - Contact information
+• /register - Get registration bot link
+• /near - Find shops near you (e.g. /near pharmacy)
+• /help - Show this help message
+
+🔍 *Search:* in any chat, type @ + this bot's username and what you're looking for, e.g. shoes bole
+
+📞 *Contact Information:*
+• Email: yetal@gmail.com
+• Phone: +251 911 234 565
+• Telegram: @YetalSupport
+• Website: https://yetal.com
+
+*We're here 24/7 to assist you!* 🌙
+"""
+    
+    update.message.reply_text(
+        help_text,
+        parse_mode=ParseMode.MARKDOWN
+    )
+
+def register(update, context):
+    """Registration information"""
+    register_text = """
+📱 *Register Your Business on Yetal* 📱
+
+Get discovered by customers searching every day.
+
+🚀 *Why Register?*
+• 🔍 Appear in search results  
+• 📍 Reach local customers  
+• 📢 Promote your services or products  
+• 📈 Increase visibility & inquiries  
+
+📝 *How It Works*
+1. Register your business  
+2. Add products or services   
+3. Customers find & contact you directly  
+
+⏱️ Registration takes less than 10 minutes.
+"""
+    
+    keyboard = []
+    
+    if REGISTRATION_BOT_URL and REGISTRATION_BOT_URL.startswith('http'):
+        keyboard.append([InlineKeyboardButton("🤖 Start Registration", url=REGISTRATION_BOT_URL)])
+    else:
+        keyboard.append([InlineKeyboardButton("🤖 Start Registration", callback_data='register_info')])
+    
+    keyboard.append([InlineKeyboardButton("📞 Contact Support", callback_data='contact')])
+    keyboard.append([InlineKeyboardButton("🔙 Back to Main", callback_data='main_menu')])
+    
+    reply_markup = InlineKeyboardMarkup(keyboard)
+    
+    update.message.reply_text(
+        register_text,
+        reply_markup=reply_markup,
+        parse_mode=ParseMode.MARKDOWN
+    )
+
+def register_info(update, context):
+    """Show registration info when URL is invalid"""
+    query = update.callback_query
+    query.answer()
+    
+    info_text = f"""
+📱 *Registration Information* 📱
+
+To register your business on Yetal:
+
+*Registration Bot:* {REGISTRATION_BOT_URL or "Not available"}
+
+*Contact for Help:*
+• Email: {CONTACT_EMAIL or "contact@yetal.com"}
+• Phone: +251 911 234 567
+• Telegram: @YetalSupport
+
+*Website:* {WEBSITE_URL or "https://yetal.com"}
+
+We'll help you get registered as soon as possible!
+"""
+    
+    keyboard = [
+        [InlineKeyboardButton("🔙 Back to Main Menu", callback_data='main_menu')],
+        [InlineKeyboardButton("📞 Contact Support", callback_data='contact')]
+    ]
+    
+    reply_markup = InlineKeyboardMarkup(keyboard)
+    
+    query.edit_message_text(
+        info_text,
+        reply_markup=reply_markup,
+        parse_mode=ParseMode.MARKDOWN
+    )
+def contact_command(update, context):
+    contact_text = f"""
+📞 *Contact Yetal* 📞
+
+📧 *Email:* {CONTACT_EMAIL}
+📱 *Phone:* +251 911 234 567
+📱 *Telegram:* @YetalSupport
+🌐 *Website:* {WEBSITE_URL}
+"""
+
+    update.message.reply_text(
+        contact_text,
+        parse_mode=ParseMode.MARKDOWN
+    )
+
+def is_admin_code(code):
+    """Check a code against ADMIN_CODE without leaking timing information"""
+    if not ADMIN_CODE or not code:
+        return False
+    return hmac.compare_digest(code.encode(), ADMIN_CODE.encode())
+
+def admin_command(update, context):
+    """Admin-only live stats and profiling
+
+    /admin <code> stats
+    /admin <code> profile [seconds]
+    """
+    args = context.args or []
+    if not args or not is_admin_code(args[0]):
+        unknown(update, context)
+        return
+
+    # Don't leave the admin code sitting in the chat history
+    try:
+        update.message.delete()
+    except Exception:
+        pass
+
+    chat_id = update.effective_chat.id
+    action = args[1] if len(args) > 1 else "stats"
+
+    if action == "stats":
+        report = format_report(stats.snapshot())
+        s = sessions.snapshot()
+        report += (
+            f"\n\nSessions: {s['size']}/{s['max_size']} cached, {s['hit_rate']:.1%} hit rate, "
+            f"{s['misses']} misses, {s['evictions']} evictions, {s['pending_writes']} pending writes"
+        )
+        context.bot.send_message(chat_id, f"📊 Yetal Bot Stats\n\n{report}")
+
+    elif action == "profile":
+        try:
+            seconds = int(args[2]) if len(args) > 2 else 10
+        except ValueError:
+            seconds = 10
+        seconds = max(1, min(seconds, MAX_PROFILE_SECONDS))
+
+        if not profiling.acquire(blocking=False):
+            context.bot.send_message(chat_id, "⏳ A profile is already running, try again when it finishes.")
+            return
+
+        # Sample from a separate thread so the webhook request isn't held open
+        def run_profile():
+            try:
+                report = format_profile(sample_profile(seconds))
+            finally:
+                profiling.release()
+            # Telegram messages are capped at 4096 characters
+            context.bot.send_message(chat_id, report[:4000])
+
+        try:
+            context.bot.send_message(chat_id, f"🔬 Profiling for {seconds}s...")
+            threading.Thread(target=run_profile, daemon=True).start()
+        except Exception:
+            profiling.release()
+            raise
+
+    else:
+        context.bot.send_message(chat_id, "Usage: /admin <code> stats | profile [seconds]")
+
+def listing_text(listing):
+    """Message sent when a search result is picked"""
+    field = lambda name: escape_markdown(str(listing[name]))
+    lines = [f"🏪 *{field('name')}*"]
+    if listing.get("category"):
+        lines.append(f"🏷️ {field('category')}")
+    if listing.get("location"):
+        lines.append(f"📍 {field('location')}")
+    if listing.get("description"):
+        lines.append(f"\n{field('description')}")
+    if listing.get("phone"):
+        lines.append(f"\n📱 {field('phone')}")
+    if listing.get("url"):
+        lines.append(f"🌐 {field('url')}")
+    return "\n".join(lines)
+
+def inline_search(update, context):
+    """Answer inline queries (@bot shoes bole) from the local catalog"""
+    query = update.inline_query
+    try:
+        offset = int(query.offset or 0)
+    except ValueError:
+        offset = 0
+
+    listings, next_offset = catalog.search(query.query, offset=offset)
+
+    results = []
+    for position, listing in enumerate(listings, start=offset):
+        description = " • ".join(str(value) for value in (listing.get("category"), listing.get("location")) if value)
+        results.append(InlineQueryResultArticle(
+            # Catalog ids may be missing or repeated, and Telegram rejects the
+            # whole answer on a duplicate result id; the rank is always unique
+            id=str(position),
+            title=str(listing["name"]),
+            description=description or None,
+            input_message_content=InputTextMessageContent(
+                listing_text(listing),
+                parse_mode=ParseMode.MARKDOWN
+            )
+        ))
+
+    query.answer(
+        results,
+        cache_time=SEARCH_CACHE_TTL,
+        next_offset=str(next_offset) if next_offset is not None else ""
+    )
+
+def near_command(update, context):
+    """Ask for the user's location, remembering an optional category"""
+    category = " ".join(context.args or []).strip()
+    sessions.update(update.effective_user.id, near_category=category)
+
+    keyboard = [[KeyboardButton("📍 Share my location", request_location=True)]]
+    reply_markup = ReplyKeyboardMarkup(keyboard, resize_keyboard=True, one_time_keyboard=True)
+
+    looking_for = f"*{escape_markdown(category)}* shops" if category else "shops"
+    update.message.reply_text(
+        f"📍 Share your location and I'll find {looking_for} near you 👇",
+        reply_markup=reply_markup,
+        parse_mode=ParseMode.MARKDOWN
+    )
+
+def shops_near_me(update, context):
+    """Reply to a shared location with the nearest registered shops"""
+    location = update.message.location
+    user = update.effective_user
+    category = sessions.pop(user.id, "near_category", "") if user else ""
+
+    nearest = shop_locator.nearest(location.latitude, location.longitude, k=NEAREST_SHOPS, category=category)
+
+    if not nearest:
+        text = "😔 No registered shops found near you yet."
+    else:
+        lines = ["📍 *Shops near you*", ""]
+        for distance, shop in nearest:
+            lines.append(f"🏪 *{escape_markdown(shop['name'])}* – {distance:.1f} km")
+            details = " • ".join(filter(None, [shop["category"], shop["address"], shop["phone"]]))
+            if details:
+                lines.append(escape_markdown(details))
+            lines.append("")
+        text = "\n".join(lines)
+
+    update.message.reply_text(
+        text,
+        reply_markup=ReplyKeyboardRemove(),
+        parse_mode=ParseMode.MARKDOWN
+    )
+
+def track_screen(update, context):
+    """Remember the last screen each user opened"""
+    user = update.effective_user
+    if not user:
+        return
+    if update.callback_query and update.callback_query.data:
+        sessions.update(user.id, last_screen=update.callback_query.data)
+    elif update.message and update.message.text and update.message.text.startswith("/"):
+        sessions.update(user.id, last_screen=update.message.text.split()[0])
+
+def unknown(update, context):
+    """Handle unknown commands"""
+    update.message.reply_text(
+        "❌ Sorry, I didn't understand that command.\n\n"
+        "Try /start to begin or /help for available commands.",
+        parse_mode=ParseMode.MARKDOWN
+    )
+
+def register_handlers(dispatcher):
+    """Attach every command and callback handler to the dispatcher"""
+    # Runs before the handlers below, in its own group
+    dispatcher.add_handler(TypeHandler(Update, track_screen), group=-1)
+
+    # Add command handlers
+    dispatcher.add_handler(CommandHandler("start", timed("/start", start)))
+    dispatcher.add_handler(CommandHandler("about", timed("/about", about_command)))
+    dispatcher.add_handler(CommandHandler("help", timed("/help", help_command)))
+    dispatcher.add_handler(CommandHandler("contact", timed("/contact", contact_command)))
+    dispatcher.add_handler(CommandHandler("near", timed("/near", near_command)))
+    dispatcher.add_handler(CommandHandler("admin", timed("/admin", admin_command)))
+    # Add callback query handlers
+    dispatcher.add_handler(CallbackQueryHandler(timed("rewards", show_rewards), pattern='^rewards$'))
+    dispatcher.add_handler(CallbackQueryHandler(timed("daily_promo", show_daily_promo), pattern='^daily_promo$'))
+    dispatcher.add_handler(CallbackQueryHandler(timed("discounts", show_discounts), pattern='^discounts$'))
+    dispatcher.add_handler(CallbackQueryHandler(timed("contact", show_contact), pattern='^contact$'))
+    dispatcher.add_handler(CallbackQueryHandler(timed("about", showabout), pattern='^about$'))
+    dispatcher.add_handler(CallbackQueryHandler(timed("main_menu", back_to_main), pattern='^main_menu$'))
+    dispatcher.add_handler(CallbackQueryHandler(timed("register_info", register_info), pattern='^register_info$'))
+
+    # Inline search
+    dispatcher.add_handler(InlineQueryHandler(timed("inline_search", inline_search)))
+
+    # Shared locations; new messages only, so a moving live location (a stream
+    # of edited_message updates) doesn't trigger a reply per edit
+    dispatcher.add_handler(MessageHandler(Filters.location & Filters.update.message, timed("location", shops_near_me)))
+
+    # Handle unknown commands
+    dispatcher.add_handler(MessageHandler(Filters.command, timed("/unknown", unknown)))
@@ -0,0 +1,123 @@
+import time
+import threading
+
+# Jacobson/Karels constants, same as TCP (RFC 6298)
+ALPHA = 1 / 8
+BETA = 1 / 4
+K = 4
+
+# Bounds for derived timeouts, in seconds
+MIN_TIMEOUT = 1.0
+MAX_TIMEOUT = 30.0
+# Used until a method has been measured at least once; also python-telegram-bot's
+# default read timeout
+DEFAULT_TIMEOUT = 5.0
+# Floor for calls that are never retried (sendMessage, editMessageText, ...).
+# RFC 6298's 1 s floor relies on TCP retransmitting; a timed-out send here just
+# drops the user's reply, and may even have gone through on Telegram's side.
+NON_IDEMPOTENT_MIN_TIMEOUT = DEFAULT_TIMEOUT
+
+# Methods that are safe to send twice, so a slow call can be hedged
+IDEMPOTENT_METHODS = {"getMe", "getChat", "getFile", "getWebhookInfo", "getChatMember"}
+
+
+def min_timeout(method):
+    if method in IDEMPOTENT_METHODS or method == "probe":
+        return MIN_TIMEOUT
+    return NON_IDEMPOTENT_MIN_TIMEOUT
+
+
+class RttEstimator:
+    """Smoothed round-trip time for one Bot API method"""
+
+    def __init__(self):
+        self.srtt = None
+        self.rttvar = None
+        self.samples = 0
+        self.last = None
+
+    def update(self, rtt):
+        if self.srtt is None:
+            self.srtt = rtt
+            self.rttvar = rtt / 2
+        else:
+            self.rttvar = (1 - BETA) * self.rttvar + BETA * abs(self.srtt - rtt)
+            self.srtt = (1 - ALPHA) * self.srtt + ALPHA * rtt
+        self.samples += 1
+        self.last = rtt
+
+    def timeout(self, floor=MIN_TIMEOUT):
+        """Retransmission-style timeout: SRTT + K * RTTVAR, clamped"""
+        if self.srtt is None:
+            return max(DEFAULT_TIMEOUT, floor)
+        return min(max(self.srtt + K * self.rttvar, floor), MAX_TIMEOUT)
+
+    def hedge_delay(self):
+        """How long to wait before sending a duplicate of an idempotent call"""
+        if self.srtt is None:
+            return None
+        return self.srtt + 2 * self.rttvar
+
+
+class LatencyTracker:
+    """Per-method RTT estimates shared by every outbound call"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.methods = {}
+
+    def _estimator(self, method):
+        estimator = self.methods.get(method)
+        if estimator is None:
+            estimator = self.methods[method] = RttEstimator()
+        return estimator
+
+    def record(self, method, rtt):
+        with self.lock:
+            self._estimator(method).update(rtt)
+
+    def timeout_for(self, method):
+        with self.lock:
+            estimator = self.methods.get(method)
+            # Fall back to the overall picture for methods we haven't seen yet
+            if estimator is None:
+                estimator = self.methods.get("probe")
+            return estimator.timeout(min_timeout(method)) if estimator else DEFAULT_TIMEOUT
+
+    def hedge_delay_for(self, method):
+        if method not in IDEMPOTENT_METHODS:
+            return None
+        with self.lock:
+            estimator = self.methods.get(method)
+            return estimator.hedge_delay() if estimator else None
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                method: {
+                    "srtt_ms": round(e.srtt * 1000, 1),
+                    "rttvar_ms": round(e.rttvar * 1000, 1),
+                    "last_ms": round(e.last * 1000, 1),
+                    "timeout_s": round(e.timeout(min_timeout(method)), 2),
+                    "samples": e.samples,
+                }
+                for method, e in self.methods.items()
+            }
+
+
+latency = LatencyTracker()
+
+
+def probe_loop(url, interval):
+    """Periodically time a lightweight request to the API host"""
+    import requests
+
+    while True:
+        started = time.perf_counter()
+        try:
+            requests.head(url, timeout=latency.timeout_for("probe"))
+            latency.record("probe", time.perf_counter() - started)
+        except Exception as e:
+            print("⚠️ Latency probe failed:", e)
+
+        time.sleep(interval)
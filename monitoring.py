@@ -0,0 +1,222 @@
+import os
+import sys
+import time
+import threading
+import traceback
+from collections import Counter, defaultdict, deque
+
+# How many samples to keep per handler / per outbound method
+SAMPLE_WINDOW = 1000
+# Window used for the requests-per-second figure
+RATE_WINDOW = 60
+
+
+class Stats:
+    """Thread-safe counters for the running bot process"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.request_times = deque()
+        self.total_requests = 0
+        self.in_flight = 0
+        # Polled updates fetched but not yet handed to the dispatcher
+        self.queued = 0
+        self.handler_latency = defaultdict(lambda: deque(maxlen=SAMPLE_WINDOW))
+        self.handler_errors = Counter()
+        self.outbound_calls = Counter()
+        self.outbound_errors = Counter()
+
+    def request_started(self):
+        now = time.time()
+        with self.lock:
+            self.total_requests += 1
+            self.in_flight += 1
+            self.request_times.append(now)
+            while self.request_times and self.request_times[0] < now - RATE_WINDOW:
+                self.request_times.popleft()
+
+    def request_finished(self):
+        with self.lock:
+            self.in_flight -= 1
+
+    def updates_queued(self, count):
+        with self.lock:
+            self.queued += count
+
+    def update_dequeued(self):
+        with self.lock:
+            self.queued -= 1
+
+    def record_handler(self, name, seconds, failed=False):
+        with self.lock:
+            self.handler_latency[name].append(seconds)
+            if failed:
+                self.handler_errors[name] += 1
+
+    def record_outbound(self, method, failed=False):
+        with self.lock:
+            self.outbound_calls[method] += 1
+            if failed:
+                self.outbound_errors[method] += 1
+
+    def requests_per_second(self):
+        now = time.time()
+        with self.lock:
+            recent = sum(1 for t in self.request_times if t >= now - RATE_WINDOW)
+        window = min(RATE_WINDOW, max(now - self.started, 1))
+        return recent / window
+
+    def snapshot(self):
+        """Return a plain dict with everything the admin command reports"""
+        with self.lock:
+            handlers = {
+                name: {
+                    "count": len(samples),
+                    "p50_ms": percentile(samples, 50) * 1000,
+                    "p99_ms": percentile(samples, 99) * 1000,
+                    "errors": self.handler_errors[name],
+                }
+                for name, samples in self.handler_latency.items()
+            }
+            outbound = {
+                method: {
+                    "calls": calls,
+                    "errors": self.outbound_errors[method],
+                    "error_rate": self.outbound_errors[method] / calls,
+                }
+                for method, calls in self.outbound_calls.items()
+            }
+            in_flight = self.in_flight
+            queued = self.queued
+            total = self.total_requests
+
+        return {
+            "uptime_s": time.time() - self.started,
+            "total_requests": total,
+            "rps": self.requests_per_second(),
+            "in_flight": in_flight,
+            "queued": queued,
+            "rss_mb": rss_bytes() / (1024 * 1024),
+            "handlers": handlers,
+            "outbound": outbound,
+        }
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of an iterable of numbers (0 if empty)"""
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    rank = max(int(round(pct / 100.0 * len(ordered))) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+def rss_bytes():
+    """Resident set size of this process"""
+    # Imported here rather than at the top to keep it off the cold-start path
+    try:
+        import psutil
+        return psutil.Process(os.getpid()).memory_info().rss
+    except ImportError:
+        pass
+    try:
+        import resource
+        # ru_maxrss is in kilobytes on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    except Exception:
+        return 0
+
+
+stats = Stats()
+
+
+def timed(name, handler):
+    """Wrap a dispatcher callback so its latency ends up in the stats"""
+    def wrapper(update, context):
+        started = time.perf_counter()
+        failed = False
+        try:
+            return handler(update, context)
+        except Exception:
+            failed = True
+            raise
+        finally:
+            stats.record_handler(name, time.perf_counter() - started, failed)
+
+    wrapper.__name__ = handler.__name__
+    wrapper.__doc__ = handler.__doc__
+    return wrapper
+
+
+def sample_profile(seconds, interval=0.005):
+    """Sample the stacks of all threads for `seconds` and count them.
+
+    Returns a Counter of collapsed stacks ("outer;inner;leaf" -> samples),
+    the same format flamegraph.pl and speedscope understand.
+    """
+    stacks = Counter()
+    own = threading.get_ident()
+    deadline = time.time() + seconds
+
+    while time.time() < deadline:
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own:
+                continue
+            frames = traceback.extract_stack(frame)
+            stacks[";".join(f"{os.path.basename(f.filename)}:{f.name}" for f in frames)] += 1
+        time.sleep(interval)
+
+    return stacks
+
+
+def top_functions(stacks, limit=15):
+    """Turn collapsed stacks into (function, self samples, total samples) rows"""
+    own = Counter()
+    total = Counter()
+    for stack, count in stacks.items():
+        frames = stack.split(";")
+        own[frames[-1]] += count
+        for frame in set(frames):
+            total[frame] += count
+
+    return [(name, samples, total[name]) for name, samples in own.most_common(limit)]
+
+
+def format_report(snapshot):
+    """Render a stats snapshot as a short plain-text report"""
+    lines = [
+        f"Uptime: {snapshot['uptime_s'] / 3600:.1f} h",
+        f"Requests: {snapshot['total_requests']} total, {snapshot['rps']:.2f} req/s",
+        f"Backlog: {snapshot['in_flight']} in flight, {snapshot['queued']} polled updates waiting",
+        f"RSS: {snapshot['rss_mb']:.1f} MB",
+        "",
+        "Handlers (p50 / p99 ms, count, errors):",
+    ]
+    for name, h in sorted(snapshot["handlers"].items()):
+        lines.append(f"  {name}: {h['p50_ms']:.1f} / {h['p99_ms']:.1f}, {h['count']}, {h['errors']}")
+
+    lines.append("")
+    lines.append("Outbound (calls, errors, error rate):")
+    for method, o in sorted(snapshot["outbound"].items()):
+        lines.append(f"  {method}: {o['calls']}, {o['errors']}, {o['error_rate']:.1%}")
+
+    return "\n".join(lines)
+
+
+def format_profile(stacks, limit=15):
+    """Render a profile as a top-functions table followed by the hottest stacks"""
+    samples = sum(stacks.values())
+    if not samples:
+        return "No samples collected"
+
+    lines = [f"{samples} samples", "", "Top functions (self %, total %):"]
+    for name, own, total in top_functions(stacks, limit):
+        lines.append(f"  {own / samples:6.1%} {total / samples:6.1%}  {name}")
+
+    lines.append("")
+    lines.append("Hottest stacks:")
+    for stack, count in stacks.most_common(5):
+        lines.append(f"{stack} {count}")
+
+    return "\n".join(lines)
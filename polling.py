@@ -0,0 +1,133 @@
+import os
+import time
+import threading
+from collections import deque, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from monitoring import stats
+
+# getUpdates returns at most 100 updates per call
+BATCH_LIMIT = 100
+# Seconds Telegram holds a getUpdates request open when there is nothing new
+LONG_POLL_TIMEOUT = 30
+
+
+class OffsetStore:
+    """The next getUpdates offset, persisted to a small file"""
+
+    def __init__(self, path):
+        self.path = path
+
+    def load(self):
+        try:
+            with open(self.path) as f:
+                return int(f.read().strip())
+        except (OSError, ValueError):
+            return None
+
+    def save(self, offset):
+        # Write-then-rename so a crash never leaves a half-written offset
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(str(offset))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+
+class RecentUpdates:
+    """Remembers recently handled update ids to drop redeliveries
+
+    Telegram can deliver an update again when we switch between webhook and
+    polling, so both paths check here before dispatching.
+    """
+
+    def __init__(self, size=10000):
+        self.lock = threading.Lock()
+        self.order = deque(maxlen=size)
+        self.ids = set()
+
+    def first_time(self, update_id):
+        with self.lock:
+            if update_id in self.ids:
+                return False
+            if len(self.order) == self.order.maxlen:
+                self.ids.discard(self.order[0])
+            self.order.append(update_id)
+            self.ids.add(update_id)
+            return True
+
+
+class Poller:
+    """Pulls updates with getUpdates and feeds them to `dispatch` in parallel
+
+    The offset is saved before a batch is dispatched, so after a restart an
+    update is never handed out twice (an update in flight during a crash is
+    dropped rather than repeated). Updates from the same chat stay in order;
+    different chats are processed concurrently.
+    """
+
+    def __init__(self, bot, dispatch, offset_path, workers=8):
+        self.bot = bot
+        self.dispatch = dispatch
+        self.offsets = OffsetStore(offset_path)
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="poll")
+        self.stop_event = threading.Event()
+        self.offset = self.offsets.load()
+
+    def poll_once(self, timeout=LONG_POLL_TIMEOUT):
+        """Fetch and process one batch, returning how many updates it held"""
+        updates = self.bot.get_updates(offset=self.offset, limit=BATCH_LIMIT, timeout=timeout)
+        if not updates:
+            return 0
+
+        self.offset = updates[-1].update_id + 1
+        self.offsets.save(self.offset)
+
+        by_chat = defaultdict(list)
+        for update in updates:
+            chat = update.effective_chat
+            by_chat[chat.id if chat else f"update-{update.update_id}"].append(update)
+
+        stats.updates_queued(len(updates))
+        futures = [self.pool.submit(self._process_in_order, chat_updates) for chat_updates in by_chat.values()]
+        for future in futures:
+            future.result()
+
+        return len(updates)
+
+    def _process_in_order(self, updates):
+        for update in updates:
+            stats.update_dequeued()
+            try:
+                self.dispatch(update)
+            except Exception as e:
+                print(f"❌ Update {update.update_id} failed: {e}")
+
+    def drain(self):
+        """Process everything already queued at Telegram, then return"""
+        total = 0
+        while not self.stop_event.is_set():
+            count = self.poll_once(timeout=0)
+            total += count
+            if count < BATCH_LIMIT:
+                return total
+        return total
+
+    def run(self, seconds=None):
+        """Long-poll until stop() is called, or for `seconds` if given"""
+        deadline = time.time() + seconds if seconds else None
+        while not self.stop_event.is_set():
+            if deadline and time.time() >= deadline:
+                return
+            try:
+                timeout = LONG_POLL_TIMEOUT
+                if deadline:
+                    timeout = max(min(timeout, int(deadline - time.time())), 0)
+                self.poll_once(timeout=timeout)
+            except Exception as e:
+                print(f"⚠️ Polling failed: {e}")
+                self.stop_event.wait(5)
+
+    def stop(self):
+        self.stop_event.set()
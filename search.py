@@ -0,0 +1,269 @@
+import os
+import json
+import math
+import time
+import threading
+import unicodedata
+from collections import OrderedDict, defaultdict
+
+# Field weights used when scoring a match
+FIELD_WEIGHTS = {"name": 3.0, "category": 2.0, "tags": 2.0, "location": 1.5, "description": 1.0}
+# A one-letter final token matches as a prefix only if it has at most this many
+# completions; otherwise it is ignored until the user types more
+MAX_PREFIX_EXPANSIONS = 50
+# Telegram shows at most 50 inline results per answer
+PAGE_SIZE = 20
+
+# Ge'ez punctuation (word space, full stop, comma, ...) acts as a separator
+ETHIOPIC_PUNCTUATION = set(range(0x1360, 0x1369))
+
+# Amharic has several letters that sound the same and are spelled either way;
+# fold each variant series onto one canonical series (all seven orders)
+ETHIOPIC_HOMOPHONES = {
+    0x1210: 0x1200,  # ሐ -> ሀ
+    0x1280: 0x1200,  # ኀ -> ሀ
+    0x1220: 0x1230,  # ሠ -> ሰ
+    0x12D0: 0x12A0,  # ዐ -> አ
+    0x1340: 0x1338,  # ፀ -> ጸ
+}
+HOMOPHONE_MAP = {
+    chr(variant + order): chr(canonical + order)
+    for variant, canonical in ETHIOPIC_HOMOPHONES.items()
+    for order in range(7)
+}
+
+
+def is_word_char(ch):
+    if ord(ch) in ETHIOPIC_PUNCTUATION:
+        return False
+    return ch.isalnum() or unicodedata.category(ch) in ("Mn", "Mc")
+
+
+def normalize(text):
+    """Case-fold, compose and fold Amharic homophones"""
+    text = unicodedata.normalize("NFC", text or "").casefold()
+    return "".join(HOMOPHONE_MAP.get(ch, ch) for ch in text)
+
+
+def tokenize(text):
+    """Split Latin and Ge'ez text into normalized word tokens"""
+    tokens = []
+    current = []
+    for ch in normalize(text):
+        if is_word_char(ch):
+            current.append(ch)
+        elif current:
+            tokens.append("".join(current))
+            current = []
+    if current:
+        tokens.append("".join(current))
+    return tokens
+
+
+class TrieNode:
+    __slots__ = ("children", "terminal")
+
+    def __init__(self):
+        self.children = {}
+        self.terminal = False
+
+
+class PrefixTrie:
+    """Vocabulary trie used to complete the token the user is still typing"""
+
+    def __init__(self):
+        self.root = TrieNode()
+
+    def add(self, word):
+        node = self.root
+        for ch in word:
+            node = node.children.setdefault(ch, TrieNode())
+        node.terminal = True
+
+    def complete(self, prefix, limit=None):
+        """Every vocabulary word starting with `prefix`, or None if there are more than `limit`"""
+        node = self.root
+        for ch in prefix:
+            node = node.children.get(ch)
+            if node is None:
+                return []
+
+        words = []
+        stack = [(node, prefix)]
+        while stack:
+            node, word = stack.pop()
+            if node.terminal:
+                words.append(word)
+                if limit is not None and len(words) > limit:
+                    return None
+            for ch, child in node.children.items():
+                stack.append((child, word + ch))
+        return words
+
+
+class SearchIndex:
+    """In-memory inverted index over catalog listings"""
+
+    def __init__(self, listings):
+        self.listings = listings
+        # token -> {listing index: weighted term frequency}
+        self.postings = defaultdict(dict)
+        self.trie = PrefixTrie()
+
+        for doc_id, listing in enumerate(listings):
+            for field, weight in FIELD_WEIGHTS.items():
+                value = listing.get(field)
+                if value is None:
+                    continue
+                if isinstance(value, (list, tuple)):
+                    value = " ".join(str(item) for item in value)
+                for token in tokenize(str(value)):
+                    postings = self.postings[token]
+                    postings[doc_id] = postings.get(doc_id, 0) + weight
+
+        for token in self.postings:
+            self.trie.add(token)
+
+    def idf(self, token):
+        return math.log(1 + len(self.listings) / len(self.postings[token]))
+
+    def search(self, query):
+        """Return listing indexes ranked by tf-idf, best first.
+
+        Every query token must match (AND); the last token also matches as a
+        prefix so results update while the user is still typing. All of its
+        completions are used, so typing another letter only ever narrows the
+        results.
+        """
+        tokens = tokenize(query)
+        prefix_last = True
+        if tokens and len(tokens[-1]) == 1 and self.trie.complete(tokens[-1], MAX_PREFIX_EXPANSIONS) is None:
+            # Too common a letter to be useful yet, wait for the next one; the
+            # remaining tokens are finished words and only match exactly
+            tokens.pop()
+            prefix_last = False
+        if not tokens:
+            return []
+
+        scores = None
+        for position, token in enumerate(tokens):
+            if prefix_last and position == len(tokens) - 1:
+                candidates = self.trie.complete(token) or []
+            else:
+                candidates = [token] if token in self.postings else []
+
+            token_scores = {}
+            for candidate in candidates:
+                # Exact matches outrank completions of the same prefix
+                boost = 1.0 if candidate == token else 0.5
+                idf = self.idf(candidate)
+                for doc_id, tf in self.postings[candidate].items():
+                    token_scores[doc_id] = max(token_scores.get(doc_id, 0), boost * tf * idf)
+
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {doc_id: score + token_scores[doc_id] for doc_id, score in scores.items() if doc_id in token_scores}
+            if not scores:
+                return []
+
+        return sorted(scores, key=lambda doc_id: (-scores[doc_id], doc_id))
+
+
+class TTLCache:
+    """Small LRU cache whose entries expire after `ttl` seconds"""
+
+    def __init__(self, max_size=1024, ttl=60):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.items = OrderedDict()
+
+    def get(self, key):
+        with self.lock:
+            item = self.items.get(key)
+            if item is None:
+                return None
+            expires, value = item
+            if expires < time.time():
+                del self.items[key]
+                return None
+            self.items.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self.lock:
+            self.items[key] = (time.time() + self.ttl, value)
+            self.items.move_to_end(key)
+            while len(self.items) > self.max_size:
+                self.items.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.items.clear()
+
+
+class Catalog:
+    """Listings loaded from a JSON file, reindexed when the file changes
+
+    The file holds a list of objects with at least a "name" and optionally
+    "category", "tags", "location", "description", "phone" and "url".
+    """
+
+    def __init__(self, path, cache_ttl=60, check_interval=30):
+        self.path = path
+        self.check_interval = check_interval
+        self.lock = threading.Lock()
+        self.index = SearchIndex([])
+        self.mtime = None
+        self.checked = 0
+        self.cache = TTLCache(ttl=cache_ttl)
+
+    def reload_if_changed(self):
+        now = time.time()
+        if now - self.checked < self.check_interval:
+            return
+        self.checked = now
+
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return
+        if mtime == self.mtime:
+            return
+
+        with self.lock:
+            if mtime == self.mtime:
+                return
+            try:
+                with open(self.path, encoding="utf-8") as f:
+                    data = json.load(f)
+                if not isinstance(data, list):
+                    raise ValueError("expected a JSON list of listings")
+                listings = [item for item in data if isinstance(item, dict) and item.get("name")]
+                index = SearchIndex(listings)
+            except Exception as e:
+                # Keep serving the previous index; don't retry this version of the file
+                self.mtime = mtime
+                print(f"⚠️ Could not load catalog {self.path}: {e}")
+                return
+
+            self.index = index
+            self.mtime = mtime
+            self.cache.clear()
+            print(f"✅ Catalog indexed: {len(listings)} listings")
+
+    def search(self, query, offset=0, limit=PAGE_SIZE):
+        """Return (listings for this page, next offset or None)"""
+        self.reload_if_changed()
+
+        key = " ".join(tokenize(query))
+        ranked = self.cache.get(key)
+        if ranked is None:
+            index = self.index
+            ranked = [index.listings[doc_id] for doc_id in index.search(key)]
+            self.cache.put(key, ranked)
+
+        page = ranked[offset:offset + limit]
+        next_offset = offset + limit if offset + limit < len(ranked) else None
+        return page, next_offset
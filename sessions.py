@@ -0,0 +1,192 @@
+import json
+import atexit
+import sqlite3
+import threading
+from collections import OrderedDict
+
+
+class UnstoredData(dict):
+    """Drop-in for Dispatcher.user_data / chat_data that keeps nothing
+
+    python-telegram-bot looks up dispatcher.user_data[user.id] and
+    chat_data[chat.id] for every update, and the default defaultdicts keep an
+    entry per user and chat forever. Lookups here hand out a throwaway dict
+    instead; per-user state lives in SessionStore.
+    """
+
+    def __missing__(self, key):
+        return {}
+
+
+class SessionStore:
+    """Per-user session data: a bounded in-memory LRU backed by SQLite
+
+    Reads are served from the hot tier when possible. Writes only mark the
+    session dirty; a background thread writes dirty sessions to disk in
+    batches, so handlers never wait on SQLite for an update.
+    """
+
+    def __init__(self, path, max_size=10000, flush_interval=5.0, batch_size=200):
+        self.max_size = max_size
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.lock = threading.Lock()
+        self.hot = OrderedDict()
+        # Dirty sessions waiting to be written, user id -> data
+        self.pending = {}
+        # The batch currently being written, still authoritative until committed
+        self.flushing = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.writes = 0
+
+        self.db_lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute("CREATE TABLE IF NOT EXISTS sessions (user_id INTEGER PRIMARY KEY, data TEXT NOT NULL)")
+        self.db.commit()
+
+        self.wake = threading.Event()
+        threading.Thread(target=self._flush_loop, daemon=True).start()
+        atexit.register(self.flush)
+
+    def get(self, user_id):
+        """Return a copy of the session dict for a user (empty if new)"""
+        return self._access(user_id, dict)
+
+    def update(self, user_id, **fields):
+        """Change fields of a user's session; the write happens in the background
+
+        Values must be JSON-serializable; anything else raises TypeError here
+        rather than failing later in the background write.
+        """
+        json.dumps(fields)
+        self._access(user_id, lambda session: session.update(fields), dirty=True)
+
+    def pop(self, user_id, key, default=None):
+        return self._access(user_id, lambda session: session.pop(key, default), dirty=True)
+
+    def _access(self, user_id, action, dirty=False):
+        """Run `action` on the live session while holding the lock
+
+        Doing the lookup, the change and the dirty marking in one critical
+        section means a concurrent miss can never reload a stale copy from
+        disk between them.
+        """
+        loaded = None
+        first_try = True
+        while True:
+            with self.lock:
+                session = self._cached(user_id)
+                if first_try:
+                    first_try = False
+                    if session is not None and user_id in self.hot:
+                        self.hits += 1
+                    else:
+                        self.misses += 1
+
+                if session is None:
+                    session = loaded
+                if session is not None:
+                    self.hot[user_id] = session
+                    self.hot.move_to_end(user_id)
+                    self._evict()
+                    result = action(session)
+                    full = False
+                    if dirty:
+                        self.pending[user_id] = session
+                        full = len(self.pending) >= self.batch_size
+                    break
+
+            # Read from disk without holding the lock, then look again
+            loaded = self._load(user_id)
+
+        if full:
+            self.wake.set()
+        return result
+
+    def _cached(self, user_id):
+        """In-memory copy of a session, if any; caller holds the lock"""
+        # An evicted session may not have reached the disk yet
+        for tier in (self.hot, self.pending, self.flushing):
+            session = tier.get(user_id)
+            if session is not None:
+                return session
+        return None
+
+    def _evict(self):
+        while len(self.hot) > self.max_size:
+            self.hot.popitem(last=False)
+            self.evictions += 1
+
+    def _load(self, user_id):
+        with self.db_lock:
+            row = self.db.execute("SELECT data FROM sessions WHERE user_id = ?", (user_id,)).fetchone()
+        return json.loads(row[0]) if row else {}
+
+    def flush(self):
+        """Write all dirty sessions to disk in one transaction"""
+        # One flush at a time, so `flushing` always describes the write in progress
+        with self.flush_lock:
+            self._flush()
+
+    def _flush(self):
+        with self.lock:
+            if not self.pending:
+                return
+            dirty = self.flushing = self.pending
+            self.pending = {}
+            batch = []
+            for user_id, session in dirty.items():
+                try:
+                    batch.append((user_id, json.dumps(session)))
+                except (TypeError, ValueError) as e:
+                    # Drop just this write; retrying it would fail forever and
+                    # hold up every other session behind it
+                    print(f"⚠️ Session of user {user_id} can't be saved: {e}")
+
+        try:
+            with self.db_lock:
+                with self.db:
+                    self.db.executemany(
+                        "INSERT INTO sessions (user_id, data) VALUES (?, ?) "
+                        "ON CONFLICT(user_id) DO UPDATE SET data = excluded.data",
+                        batch
+                    )
+        except sqlite3.Error:
+            # Keep the sessions dirty so the next flush retries them
+            with self.lock:
+                for user_id, session in dirty.items():
+                    self.pending.setdefault(user_id, session)
+                self.flushing = {}
+            raise
+
+        with self.lock:
+            self.flushing = {}
+            self.writes += len(batch)
+
+    def _flush_loop(self):
+        while True:
+            self.wake.wait(self.flush_interval)
+            self.wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"⚠️ Session flush failed: {e}")
+
+    def snapshot(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self.hot),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "pending_writes": len(self.pending),
+                "writes": self.writes,
+            }
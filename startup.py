@@ -0,0 +1,58 @@
+import time
+import importlib
+import threading
+from contextlib import contextmanager
+
+# Taken as early as possible: this is the first module bot.py imports
+PROCESS_START = time.perf_counter()
+
+
+class StartupProfiler:
+    """Records how long each import and startup phase takes"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.imports = {}
+        self.phases = {}
+        self.first_response = None
+
+    def elapsed(self):
+        return time.perf_counter() - PROCESS_START
+
+    @contextmanager
+    def phase(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self.lock:
+                self.phases[name] = {
+                    "start_ms": round((started - PROCESS_START) * 1000, 1),
+                    "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+                }
+
+    def load(self, module_name):
+        """Import a module and record how long it took"""
+        started = time.perf_counter()
+        module = importlib.import_module(module_name)
+        with self.lock:
+            # Only the first import does any work, later ones hit sys.modules
+            self.imports.setdefault(module_name, round((time.perf_counter() - started) * 1000, 1))
+        return module
+
+    def mark_first_response(self):
+        with self.lock:
+            if self.first_response is None:
+                self.first_response = self.elapsed()
+
+    def report(self):
+        with self.lock:
+            first_response = self.first_response
+            return {
+                "time_to_first_response_ms": round(first_response * 1000, 1) if first_response else None,
+                "imports_ms": dict(self.imports),
+                "phases": dict(self.phases),
+            }
+
+
+profiler = StartupProfiler()
@@ -0,0 +1,9 @@
+import os
+import sys
+import tempfile
+
+# The bot's modules live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# handlers opens its session database at import time; keep it out of the repo
+os.environ.setdefault("SESSIONS_PATH", os.path.join(tempfile.mkdtemp(prefix="yetal-tests-"), "sessions.db"))
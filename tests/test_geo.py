@@ -0,0 +1,132 @@
+import csv
+import random
+
+from geo import GridIndex, ShopLocator, haversine_km, read_shops
+
+FIELDS = ["id", "name", "category", "lat", "lon", "address", "phone"]
+
+
+def make_shops(count, seed=2):
+    rng = random.Random(seed)
+    return [
+        {
+            "id": str(i),
+            "name": f"Shop {i}",
+            "category": rng.choice(["Pharmacy", "Cafe", "Electronics"]),
+            "lat": 9.0 + rng.uniform(-0.1, 0.1),
+            "lon": 38.75 + rng.uniform(-0.1, 0.1),
+            "address": "Addis Ababa",
+            "phone": "",
+        }
+        for i in range(count)
+    ]
+
+
+def write_shops(path, shops, encoding="utf-8"):
+    with open(path, "w", newline="", encoding=encoding) as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(shops)
+
+
+def brute_force(shops, lat, lon, k, category=None):
+    matches = [s for s in shops if not category or category in s["category"].casefold()]
+    return [s["id"] for s in sorted(matches, key=lambda s: haversine_km(lat, lon, s["lat"], s["lon"]))[:k]]
+
+
+def build_index(shops):
+    index = GridIndex()
+    for offset, shop in enumerate(shops):
+        index.add(shop["id"], shop["lat"], shop["lon"], shop["category"], offset)
+    return index
+
+
+def test_nearest_matches_brute_force():
+    shops = make_shops(5000)
+    index = build_index(shops)
+
+    rng = random.Random(3)
+    for _ in range(20):
+        lat, lon = 9.0 + rng.uniform(-0.12, 0.12), 38.75 + rng.uniform(-0.12, 0.12)
+        for category in (None, "pharmacy"):
+            found = [index.ids[slot] for _, slot in index.nearest(lat, lon, k=5, category=category)]
+            assert found == brute_force(shops, lat, lon, 5, category)
+
+
+def test_remove_frees_slot_for_reuse():
+    shops = make_shops(3)
+    index = build_index(shops)
+    index.remove("1")
+    assert len(index) == 2
+    index.add("new", shops[1]["lat"], shops[1]["lon"], shops[1]["category"], 1)
+    assert len(index.ids) == 3
+    assert "1" not in {index.ids[slot] for _, slot in index.nearest(9.0, 38.75, k=10)}
+
+
+def test_locator_applies_file_changes_incrementally(tmp_path):
+    path = tmp_path / "shops.csv"
+    shops = make_shops(200)
+    write_shops(path, shops)
+    locator = ShopLocator(str(path), check_interval=0)
+    locator.reload_if_changed()
+    assert len(locator.index) == 200
+
+    shops[0].update(lat=9.05, lon=38.8, category="Pharmacy")
+    del shops[5]
+    write_shops(path, shops)
+    locator.mtime = None
+    locator.reload_if_changed()
+
+    assert len(locator.index) == 199
+    assert locator.nearest(9.05, 38.8, k=1, category="Pharmacy")[0][1]["id"] == "0"
+
+
+def test_details_are_read_from_the_file(tmp_path):
+    path = tmp_path / "shops.csv"
+    shops = make_shops(50)
+    shops[7].update(name="Abebe's \"Best\"\nCafe", address="Bole, Addis Ababa", phone="+251 911")
+    write_shops(path, shops)
+    locator = ShopLocator(str(path), check_interval=0)
+
+    _, shop = locator.nearest(shops[7]["lat"], shops[7]["lon"], k=1)[0]
+    assert shop == dict(shops[7])
+
+
+def test_rewritten_file_is_picked_up_before_answering(tmp_path):
+    path = tmp_path / "shops.csv"
+    shops = make_shops(50)
+    write_shops(path, shops)
+    locator = ShopLocator(str(path), check_interval=3600)
+    locator.reload_if_changed(force=True)
+
+    # Rows move within the file, and the old offsets now point at other shops
+    shops[3]["name"] = "Renamed"
+    write_shops(path, shops[::-1])
+
+    _, shop = locator.nearest(shops[3]["lat"], shops[3]["lon"], k=1)[0]
+    assert shop["id"] == "3"
+    assert shop["name"] == "Renamed"
+
+
+def test_excel_bom_header_is_read(tmp_path):
+    path = tmp_path / "shops.csv"
+    write_shops(path, make_shops(10), encoding="utf-8-sig")
+    assert len(list(read_shops(str(path)))) == 10
+
+
+def test_bad_shop_file_keeps_previous_index(tmp_path):
+    path = tmp_path / "shops.csv"
+    write_shops(path, make_shops(10))
+    locator = ShopLocator(str(path), check_interval=0)
+    locator.reload_if_changed()
+
+    path.write_bytes(b"id,name,lat,lon\n1,\xff\xfe,9,38\n")
+    locator.mtime = None
+    locator.reload_if_changed()
+    assert len(locator.index) == 10
+
+
+def test_short_rows_are_skipped(tmp_path):
+    path = tmp_path / "shops.csv"
+    path.write_text("id,name,category,lat,lon\n1,Cafe,Cafe,9.0,38.7\n2\n3,Bar,Bar,nan,38.7\n", encoding="utf-8")
+    assert [shop["id"] for _, shop in read_shops(str(path))] == ["1"]
@@ -0,0 +1,123 @@
+import json
+import time
+import threading
+from collections import Counter
+from unittest import mock
+
+from telegram import Chat, Location, Message, Update, User
+from telegram.ext import MessageHandler
+
+import handlers
+from search import Catalog
+
+
+def location_message(chat_type=Chat.PRIVATE, user=True):
+    chat = Chat(1, chat_type)
+    return Message(
+        1, None, chat,
+        from_user=User(7, "Abebe", False) if user else None,
+        location=Location(38.75, 9.0),
+    )
+
+
+def location_handler():
+    dispatcher = mock.Mock()
+    handlers.register_handlers(dispatcher)
+    registered = [call.args[0] for call in dispatcher.add_handler.call_args_list]
+    return next(h for h in registered if isinstance(h, MessageHandler) and h.callback.__name__ == "shops_near_me")
+
+
+def test_location_handler_ignores_live_location_edits_and_channel_posts():
+    handler = location_handler()
+    assert handler.check_update(Update(1, message=location_message()))
+    assert not handler.check_update(Update(2, edited_message=location_message()))
+    assert not handler.check_update(Update(3, channel_post=location_message(Chat.CHANNEL, user=False)))
+
+
+def test_shops_near_me_without_user():
+    update = Update(1, message=location_message(user=False))
+    with mock.patch.object(handlers, "shop_locator") as locator, \
+            mock.patch.object(Message, "reply_text") as reply:
+        locator.nearest.return_value = []
+        handlers.shops_near_me(update, mock.Mock())
+
+    locator.nearest.assert_called_once_with(9.0, 38.75, k=handlers.NEAREST_SHOPS, category="")
+    reply.assert_called_once()
+
+
+def test_inline_result_ids_are_unique(tmp_path):
+    catalog_path = tmp_path / "catalog.json"
+    catalog_path.write_text(json.dumps(
+        [{"id": 1, "name": "Shoe shop"}, {"name": "Shoe market"}, {"id": 1, "name": "Shoe stall"}]
+        + [{"id": "same", "name": f"Shoe store {i}"} for i in range(30)]
+    ))
+    query = mock.Mock(query="shoe", offset="")
+
+    with mock.patch.object(handlers, "catalog", Catalog(str(catalog_path))):
+        handlers.inline_search(mock.Mock(inline_query=query), mock.Mock())
+        first_page = query.answer.call_args.args[0]
+        query.offset = query.answer.call_args.kwargs["next_offset"]
+        handlers.inline_search(mock.Mock(inline_query=query), mock.Mock())
+        second_page = query.answer.call_args.args[0]
+
+    ids = [result.id for result in first_page + second_page]
+    assert len(ids) == 33
+    assert len(set(ids)) == len(ids)
+
+
+def admin(*args):
+    update = mock.Mock()
+    context = mock.Mock(args=list(args))
+    handlers.admin_command(update, context)
+    return update, context
+
+
+def test_admin_rejected_without_admin_code():
+    with mock.patch.object(handlers, "ADMIN_CODE", None):
+        assert not handlers.is_admin_code("")
+        assert not handlers.is_admin_code("anything")
+        update, context = admin("anything", "stats")
+    update.message.reply_text.assert_called_once()
+    assert "didn't understand" in update.message.reply_text.call_args.args[0]
+    context.bot.send_message.assert_not_called()
+
+
+def test_admin_wrong_code_looks_like_unknown_command():
+    with mock.patch.object(handlers, "ADMIN_CODE", "s3cret"):
+        update, context = admin("guess", "stats")
+    assert "didn't understand" in update.message.reply_text.call_args.args[0]
+    update.message.delete.assert_not_called()
+    context.bot.send_message.assert_not_called()
+
+
+def test_admin_stats():
+    with mock.patch.object(handlers, "ADMIN_CODE", "s3cret"):
+        update, context = admin("s3cret", "stats")
+    update.message.delete.assert_called_once()
+    text = context.bot.send_message.call_args.args[1]
+    assert text.startswith("📊 Yetal Bot Stats")
+    assert "Sessions:" in text
+
+
+def test_admin_profile_is_clamped_and_runs_one_at_a_time():
+    release = threading.Event()
+    sampled = []
+
+    def fake_profile(seconds):
+        sampled.append(seconds)
+        release.wait(5)
+        return Counter()
+
+    with mock.patch.object(handlers, "ADMIN_CODE", "s3cret"), \
+            mock.patch.object(handlers, "sample_profile", fake_profile):
+        _, first = admin("s3cret", "profile", "100000")
+        _, second = admin("s3cret", "profile", "5")
+        release.set()
+        deadline = time.time() + 5
+        while handlers.profiling.locked() and time.time() < deadline:
+            time.sleep(0.01)
+
+    assert sampled == [handlers.MAX_PROFILE_SECONDS]
+    assert f"{handlers.MAX_PROFILE_SECONDS}s" in first.bot.send_message.call_args_list[0].args[1]
+    assert "already running" in second.bot.send_message.call_args.args[1]
+    assert not handlers.profiling.locked()
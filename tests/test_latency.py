@@ -0,0 +1,106 @@
+import time
+
+from latency import RttEstimator, LatencyTracker, MAX_TIMEOUT, MIN_TIMEOUT, NON_IDEMPOTENT_MIN_TIMEOUT
+
+
+def test_estimator_converges_on_steady_rtt():
+    estimator = RttEstimator()
+    for _ in range(50):
+        estimator.update(0.2)
+    assert abs(estimator.srtt - 0.2) < 1e-6
+    assert estimator.rttvar < 0.01
+
+
+def test_estimator_backs_off_on_jitter():
+    steady = RttEstimator()
+    jittery = RttEstimator()
+    for i in range(50):
+        steady.update(0.5)
+        jittery.update(0.1 if i % 2 else 0.9)
+    assert jittery.timeout() > steady.timeout()
+
+
+def test_timeout_is_clamped():
+    estimator = RttEstimator()
+    estimator.update(0.01)
+    assert estimator.timeout() == MIN_TIMEOUT
+    estimator.update(100)
+    assert estimator.timeout() == MAX_TIMEOUT
+
+
+def test_non_idempotent_methods_keep_the_higher_floor():
+    tracker = LatencyTracker()
+    for method in ("sendMessage", "getMe"):
+        for _ in range(10):
+            tracker.record(method, 0.05)
+    assert tracker.timeout_for("sendMessage") == NON_IDEMPOTENT_MIN_TIMEOUT
+    assert tracker.timeout_for("getMe") == MIN_TIMEOUT
+
+
+def test_only_idempotent_methods_are_hedged():
+    tracker = LatencyTracker()
+    tracker.record("getMe", 0.1)
+    tracker.record("sendMessage", 0.1)
+    assert tracker.hedge_delay_for("getMe") is not None
+    assert tracker.hedge_delay_for("sendMessage") is None
+
+
+def test_hedged_call_returns_the_faster_copy(monkeypatch):
+    from telegram.utils.request import Request
+    import api_client
+
+    tracker = LatencyTracker()
+    monkeypatch.setattr(api_client, "latency", tracker)
+    for _ in range(10):
+        tracker.record("getMe", 0.02)
+
+    calls = []
+
+    def fake_post(self, url, data, timeout=None):
+        calls.append(timeout)
+        # The first copy stalls, the hedge answers right away
+        time.sleep(0.5 if len(calls) == 1 else 0.01)
+        return len(calls)
+
+    monkeypatch.setattr(Request, "post", fake_post)
+    started = time.perf_counter()
+    result = api_client.TrackedRequest().post("https://api.telegram.org/botT/getMe", {})
+    assert result == 2
+    assert time.perf_counter() - started < 0.4
+
+
+def test_hedged_call_does_not_queue_behind_stalled_calls(monkeypatch):
+    import threading
+    from telegram.utils.request import Request
+    import api_client
+
+    tracker = LatencyTracker()
+    monkeypatch.setattr(api_client, "latency", tracker)
+    for _ in range(10):
+        tracker.record("getMe", 0.02)
+
+    stalled = threading.Event()
+
+    def fake_post(self, url, data, timeout=None):
+        if data.get("stall"):
+            stalled.wait(5)
+        return "ok"
+
+    monkeypatch.setattr(Request, "post", fake_post)
+    request = api_client.TrackedRequest()
+    # Occupy every hedge worker with a call that never answers
+    blockers = [
+        threading.Thread(target=request.post, args=("https://api.telegram.org/botT/getMe", {"stall": True}))
+        for _ in range(api_client.HEDGE_WORKERS)
+    ]
+    for thread in blockers:
+        thread.start()
+    try:
+        time.sleep(0.1)
+        started = time.perf_counter()
+        assert request.post("https://api.telegram.org/botT/getMe", {}) == "ok"
+        assert time.perf_counter() - started < 0.5
+    finally:
+        stalled.set()
+        for thread in blockers:
+            thread.join()
@@ -0,0 +1,46 @@
+import time
+import threading
+
+from monitoring import Stats, percentile, sample_profile, top_functions, format_report
+
+
+def test_percentile_nearest_rank():
+    samples = list(range(1, 101))
+    assert percentile(samples, 50) == 50
+    assert percentile(samples, 99) == 99
+    assert percentile([], 50) == 0.0
+
+
+def test_snapshot_reports_backlog_and_error_rates():
+    stats = Stats()
+    stats.request_started()
+    stats.updates_queued(3)
+    stats.update_dequeued()
+    stats.record_outbound("sendMessage")
+    stats.record_outbound("sendMessage", failed=True)
+    stats.record_handler("/start", 0.02)
+
+    snapshot = stats.snapshot()
+    assert snapshot["in_flight"] == 1
+    assert snapshot["queued"] == 2
+    assert snapshot["outbound"]["sendMessage"]["error_rate"] == 0.5
+    assert snapshot["handlers"]["/start"]["count"] == 1
+    assert "2 polled updates waiting" in format_report(snapshot)
+
+
+def test_profiler_sees_busy_thread():
+    stop = threading.Event()
+
+    def busy_loop():
+        while not stop.is_set():
+            sum(range(1000))
+
+    thread = threading.Thread(target=busy_loop)
+    thread.start()
+    try:
+        stacks = sample_profile(0.2, interval=0.002)
+    finally:
+        stop.set()
+        thread.join()
+
+    assert any(name.endswith(":busy_loop") for name, _, total in top_functions(stacks, limit=50))
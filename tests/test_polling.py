@@ -0,0 +1,110 @@
+import time
+import threading
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from polling import Poller, OffsetStore, RecentUpdates, BATCH_LIMIT
+
+
+class FakeUpdate:
+    def __init__(self, update_id, chat_id):
+        self.update_id = update_id
+        self.effective_chat = SimpleNamespace(id=chat_id)
+
+
+class FakeBot:
+    def __init__(self, count, chats=7):
+        self.updates = [FakeUpdate(i, i % chats) for i in range(1, count + 1)]
+
+    def get_updates(self, offset=None, limit=100, timeout=0):
+        return [u for u in self.updates if offset is None or u.update_id >= offset][:limit]
+
+
+def collect():
+    seen = []
+    lock = threading.Lock()
+
+    def dispatch(update):
+        with lock:
+            seen.append(update)
+
+    return seen, dispatch
+
+
+def test_drain_processes_backlog_once_in_chat_order(tmp_path):
+    seen, dispatch = collect()
+    poller = Poller(FakeBot(2500), dispatch, str(tmp_path / "offset"))
+    assert poller.drain() == 2500
+
+    ids = [u.update_id for u in seen]
+    assert sorted(ids) == list(range(1, 2501))
+    for chat in range(7):
+        in_chat = [u.update_id for u in seen if u.effective_chat.id == chat]
+        assert in_chat == sorted(in_chat)
+
+
+def test_offset_survives_restart(tmp_path):
+    path = str(tmp_path / "offset")
+    bot = FakeBot(250)
+    seen, dispatch = collect()
+    Poller(bot, dispatch, path).drain()
+    assert OffsetStore(path).load() == 251
+
+    bot.updates.append(FakeUpdate(251, 0))
+    again, dispatch = collect()
+    assert Poller(bot, dispatch, path).drain() == 1
+    assert [u.update_id for u in again] == [251]
+
+
+def test_offset_is_saved_before_dispatch(tmp_path):
+    path = str(tmp_path / "offset")
+    saved = []
+
+    def dispatch(update):
+        saved.append(OffsetStore(path).load())
+
+    Poller(FakeBot(3), dispatch, path).poll_once(timeout=0)
+    assert saved == [4, 4, 4]
+
+
+def test_failing_update_does_not_stop_batch(tmp_path):
+    seen = []
+
+    def dispatch(update):
+        if update.update_id == 2:
+            raise RuntimeError("boom")
+        seen.append(update.update_id)
+
+    Poller(FakeBot(5, chats=1), dispatch, str(tmp_path / "offset")).poll_once(timeout=0)
+    assert seen == [1, 3, 4, 5]
+
+
+def test_drain_stops_after_short_batch(tmp_path):
+    seen, dispatch = collect()
+    assert Poller(FakeBot(BATCH_LIMIT - 1), dispatch, str(tmp_path / "offset")).drain() == BATCH_LIMIT - 1
+
+
+def test_recent_updates_drops_repeats_within_window():
+    recent = RecentUpdates(size=3)
+    assert [recent.first_time(i) for i in (1, 2, 1, 3, 4, 1)] == [True, True, False, True, True, True]
+
+
+def webhook_info(url, error_age=None, pending=0):
+    last_error = None
+    if error_age is not None:
+        last_error = datetime.fromtimestamp(time.time() - error_age, tz=timezone.utc)
+    return SimpleNamespace(url=url, last_error_date=last_error, pending_update_count=pending)
+
+
+def test_webhook_health():
+    from bot import webhook_healthy
+
+    url = "https://example.com/hook"
+    long_ago = time.time() - 3600
+    assert webhook_healthy(webhook_info(url), url, long_ago)
+    assert not webhook_healthy(webhook_info(url, error_age=5, pending=3), url, long_ago)
+    # Errors with nothing pending, or from before the webhook was restored, are ignored
+    assert webhook_healthy(webhook_info(url, error_age=5, pending=0), url, long_ago)
+    assert webhook_healthy(webhook_info(url, error_age=30, pending=3), url, time.time() - 10)
+    # A webhook deliberately pointed elsewhere is left alone
+    assert webhook_healthy(webhook_info("https://other.example/hook", error_age=5, pending=3), url, long_ago)
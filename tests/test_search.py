@@ -0,0 +1,111 @@
+import json
+import random
+
+from search import tokenize, SearchIndex, Catalog, TTLCache, PrefixTrie
+
+WORDS = ["shoes", "shop", "bole", "bakery", "bank", "book", "boutique", "piassa", "coffee",
+         "ቡና", "ጫማ", "ሱቅ", "pharmacy", "phone", "kazanchis", "cafe", "ዳቦ", "bar", "beauty"]
+
+
+def make_listings(count, seed=1):
+    rng = random.Random(seed)
+    return [
+        {
+            "id": i,
+            "name": " ".join(rng.sample(WORDS, 2)) + f" {i}",
+            "category": rng.choice(WORDS),
+            "location": rng.choice(["Bole", "Piassa", "ቦሌ", "Kazanchis"]),
+            "description": " ".join(rng.sample(WORDS, 4)),
+        }
+        for i in range(count)
+    ]
+
+
+def test_tokenize_latin_and_geez():
+    assert tokenize("Shoes, Bole፡ቡና።ጫማ") == ["shoes", "bole", "ቡና", "ጫማ"]
+
+
+def test_tokenize_folds_amharic_homophones():
+    # ሐበሻ and ሀበሻ are the same word spelled with different "h" letters
+    assert tokenize("ሐበሻ") == tokenize("ሀበሻ")
+    assert tokenize("ፀሐይ") == tokenize("ጸሀይ")
+
+
+def test_trie_returns_every_completion_or_none_over_limit():
+    trie = PrefixTrie()
+    for word in ["bole", "book", "bank", "cafe"]:
+        trie.add(word)
+    assert sorted(trie.complete("b")) == ["bank", "bole", "book"]
+    assert trie.complete("b", limit=2) is None
+    assert trie.complete("x") == []
+
+
+def test_typing_more_never_widens_results():
+    index = SearchIndex(make_listings(5000))
+    query = "shoes "
+    previous = set(index.search(query))
+    for ch in "bole":
+        query += ch
+        current = set(index.search(query))
+        assert current <= previous, query
+        previous = current
+    assert previous
+
+
+def test_prefix_match_finds_completed_word():
+    index = SearchIndex(make_listings(5000))
+    assert set(index.search("shoes bole")) <= set(index.search("shoes bo"))
+    assert set(index.search("shoes bo")) <= set(index.search("shoes b"))
+
+
+def test_name_matches_rank_above_description_matches():
+    index = SearchIndex([
+        {"name": "Abebe Store", "description": "we sell coffee"},
+        {"name": "Coffee House"},
+    ])
+    assert index.search("coffee") == [1, 0]
+
+
+def test_non_string_fields_are_indexed():
+    index = SearchIndex([{"name": 42, "tags": ["shoes", 7], "location": {"area": "bole"}}])
+    assert index.search("shoes") == [0]
+    assert index.search("42") == [0]
+
+
+def test_catalog_pages_results(tmp_path):
+    path = tmp_path / "catalog.json"
+    path.write_text(json.dumps(make_listings(500), ensure_ascii=False), encoding="utf-8")
+    catalog = Catalog(str(path))
+
+    first, next_offset = catalog.search("shoes", limit=10)
+    assert len(first) == 10 and next_offset == 10
+    second, _ = catalog.search("shoes", offset=next_offset, limit=10)
+    assert not {l["id"] for l in first} & {l["id"] for l in second}
+
+
+def test_bad_catalog_keeps_previous_index(tmp_path):
+    path = tmp_path / "catalog.json"
+    path.write_text(json.dumps([{"name": "Bole Shoes"}]), encoding="utf-8")
+    catalog = Catalog(str(path), check_interval=0)
+    catalog.reload_if_changed()
+
+    for bad in ['{"name": "not a list"}', "[1, 2, 3", b"\xff\xfe"]:
+        if isinstance(bad, bytes):
+            path.write_bytes(bad)
+        else:
+            path.write_text(bad, encoding="utf-8")
+        catalog.mtime = None
+        catalog.reload_if_changed()
+        catalog.cache.clear()
+        assert catalog.search("bole")[0][0]["name"] == "Bole Shoes"
+
+
+def test_ttl_cache_expires(monkeypatch):
+    import search
+    now = [1000.0]
+    monkeypatch.setattr(search.time, "time", lambda: now[0])
+    cache = TTLCache(max_size=2, ttl=10)
+    cache.put("a", 1)
+    assert cache.get("a") == 1
+    now[0] += 11
+    assert cache.get("a") is None
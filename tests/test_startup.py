@@ -0,0 +1,91 @@
+import os
+import sys
+import json
+import time
+import socket
+import subprocess
+from urllib.request import urlopen
+
+import pytest
+
+from config import STARTUP_BUDGET_MS
+
+BOT_PY = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "bot.py")
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture
+def blackhole():
+    """A proxy that accepts connections and never answers, so every Bot API call hangs"""
+    server = socket.socket()
+    server.bind(("127.0.0.1", 0))
+    server.listen(16)
+    yield f"http://127.0.0.1:{server.getsockname()[1]}"
+    server.close()
+
+
+def start_bot(tmp_path, blackhole, mode):
+    port = free_port()
+    env = dict(
+        os.environ,
+        BOT_TOKEN="123:test",
+        PORT=str(port),
+        STARTUP_MODE=mode,
+        UPDATE_MODE="webhook",
+        HTTPS_PROXY=blackhole,
+        LATENCY_PROBE_INTERVAL="0",
+        RENDER_EXTERNAL_URL="http://127.0.0.1:1",
+    )
+    process = subprocess.Popen(
+        [sys.executable, BOT_PY], cwd=tmp_path, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    return process, port
+
+
+def wait_for_health(port, seconds):
+    """Poll /health, returning (elapsed seconds, body) or None if it never answered"""
+    started = time.perf_counter()
+    while time.perf_counter() - started < seconds:
+        try:
+            body = json.loads(urlopen(f"http://127.0.0.1:{port}/health", timeout=1).read())
+            return time.perf_counter() - started, body
+        except OSError:
+            time.sleep(0.01)
+    return None
+
+
+def stop(process):
+    process.terminate()
+    process.wait(timeout=10)
+
+
+def test_health_answers_within_budget_while_bot_setup_hangs(tmp_path, blackhole):
+    process, port = start_bot(tmp_path, blackhole, "fast")
+    try:
+        result = wait_for_health(port, 10)
+        assert result is not None, "/health never answered"
+        elapsed, body = result
+        assert elapsed * 1000 <= STARTUP_BUDGET_MS
+        # Telegram is unreachable, so this proves setup didn't gate the server
+        assert body["bot_status"] == "initializing"
+
+        report = json.loads(urlopen(f"http://127.0.0.1:{port}/startup", timeout=1).read())
+        assert "flask" in report["imports_ms"]
+        assert report["time_to_first_response_ms"] is not None
+    finally:
+        stop(process)
+
+
+def test_blocking_startup_misses_budget(tmp_path, blackhole):
+    # Guards the test above: if setup blocks the server, the budget is blown
+    process, port = start_bot(tmp_path, blackhole, "blocking")
+    try:
+        assert wait_for_health(port, STARTUP_BUDGET_MS / 1000) is None
+    finally:
+        stop(process)